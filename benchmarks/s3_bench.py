@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+"""
+Throughput benchmarks of BotoMinio against a local S3 stand-in.
+
+By default an in-process moto server is started (pip install "moto[server]"). Use --endpoint to run against
+an already running MinIO (or any S3 compatible server), or --minio to start a local MinIO binary.
+Every scenario reports ops/sec, p50/p99 latency and the mean number of S3 round-trips per call, and the results
+can be written as JSON and compared with a previous run.
+
+    python benchmarks/s3_bench.py --json after.json --compare before.json
+    python benchmarks/s3_bench.py --minio ./minio --list-keys 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+KB = 1024
+MB = 1024 * KB
+DEFAULT_SIZES = [1 * KB, 64 * KB, 1 * MB, 16 * MB]
+ACCESS_KEY = 'benchmark'
+SECRET_KEY = 'benchmark-secret'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Storage server did not start on port {port}")
+
+
+class StorageServer:
+    """
+    Starts (and stops) the local S3 stand-in, or points at an existing endpoint.
+    """
+
+    def __init__(self, endpoint: str = None, minio: str = None):
+        self.endpoint = endpoint
+        self.minio = minio
+        self.kind = 'external' if endpoint else ('minio' if minio else 'moto')
+        self._process = None
+        self._moto = None
+        self._data_dir = None
+
+    def __enter__(self):
+        if self.endpoint:
+            return self
+        port = _free_port()
+        if self.minio:
+            self._data_dir = tempfile.mkdtemp(prefix='s3lib-bench-')
+            env = dict(os.environ, MINIO_ROOT_USER=ACCESS_KEY, MINIO_ROOT_PASSWORD=SECRET_KEY)
+            self._process = subprocess.Popen([self.minio, 'server', self._data_dir, '--address', f'127.0.0.1:{port}'],
+                                             env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            from moto.server import ThreadedMotoServer
+
+            self._moto = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+            self._moto.start()
+        _wait_for_port(port)
+        self.endpoint = f'http://127.0.0.1:{port}/'
+        return self
+
+    def __exit__(self, *exc):
+        if self._moto:
+            self._moto.stop()
+        if self._process:
+            self._process.terminate()
+            self._process.wait()
+        if self._data_dir:
+            shutil.rmtree(self._data_dir, ignore_errors=True)
+
+
+def configure(endpoint: str, access_key: str, secret_key: str, existence_cache: bool):
+    import logging
+    from django.conf import settings
+
+    settings.configure(STORAGE_SERVICE='s3', S3_ACCESS_KEY=access_key, S3_SECRET_KEY=secret_key,
+                       S3_INTERNAL_HOST_URL=endpoint, S3_EXTERNAL_HOST_URL=endpoint, USE_S3_EXTERNAL_CLIENT=False,
+                       STORAGE_VERSION='s3v4', DEFAULT_S3_LINK_EXPIRY_TIMEOUT=3600,
+                       S3_EXISTENCE_CACHE_ENABLED=existence_cache)
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    # Failed HEADs are logged with tracebacks by the library, keep the benchmark output readable
+    logging.getLogger('s3lib').setLevel(logging.CRITICAL)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+
+def _percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _clear_caches():
+    from s3lib.cache import existence_cache, object_cache, presigned_url_cache
+
+    existence_cache.clear()
+    presigned_url_cache.clear()
+    object_cache.clear()
+
+
+def measure(name: str, sink, operation, arguments, cold: bool = False, warm_up: bool = False) -> dict:
+    """
+    Calls operation(argument) for every argument, one at a time, and summarises the latencies.
+    The library caches are cleared first, so no scenario benefits from the calls of the previous ones.
+    cold clears them again before every call, warm_up calls the operation once per distinct argument before
+    measuring. Round-trips are counted from the request metrics, so the requests of the managed transfer threads
+    are included.
+    """
+    from s3lib.metrics import REQUEST_COUNT
+
+    _clear_caches()
+    if warm_up:
+        for argument in dict.fromkeys(arguments):
+            operation(argument)
+    sink.reset()
+    latencies = []
+    elapsed = 0.0
+    for argument in arguments:
+        if cold:
+            _clear_caches()
+        call_start = time.perf_counter()
+        operation(argument)
+        latencies.append(time.perf_counter() - call_start)
+        elapsed += latencies[-1]
+    requests = sink.count(REQUEST_COUNT)
+    result = {
+        'name': name,
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'round_trips_per_call': requests / len(latencies) if latencies else 0.0,
+    }
+    print(f"{name:<44} {result['ops']:>8} ops {result['ops_per_sec']:>10.1f} ops/s  p50 {result['p50_ms']:>9.2f} ms"
+          f"  p99 {result['p99_ms']:>9.2f} ms  {result['round_trips_per_call']:>5.2f} rt/call")
+    return result
+
+
+def _size_label(size: int) -> str:
+    return f"{size // MB}MB" if size >= MB else f"{size // KB}KB"
+
+
+def _key(index: int) -> str:
+    return f"data/{index // 1000:04d}/{index:07d}.txt"
+
+
+def _populate(storage, bucket_name: str, start: int, stop: int, workers: int):
+    items = ((b'x', _key(index), 'text/plain') for index in range(start, stop))
+    failures = [result for result in storage.put_many(bucket_name, items, max_workers=workers) if not result['Success']]
+    if failures:
+        raise RuntimeError(f"{len(failures)} objects could not be created, e.x : {failures[0]}")
+
+
+def run(args) -> list:
+    from django.conf import settings
+    from s3lib.lib import BotoMinio
+    from s3lib.metrics import InMemorySink, set_sink
+
+    sink = InMemorySink()
+    set_sink(sink)
+    storage = BotoMinio()
+    bucket_name = f"s3lib-bench-{uuid.uuid4().hex[:8]}"
+    storage.client.create_bucket(Bucket=bucket_name)
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='s3lib-bench-')
+    try:
+        for size in args.sizes:
+            data = os.urandom(size)
+            count = max(3, min(args.ops, (64 * MB) // size))
+            results.append(measure(f"put_object[{_size_label(size)}]", sink,
+                                   lambda key: storage.put_object(bucket_name, data, key),
+                                   [f"put/{size}/{index}" for index in range(count)]))
+            file_name = os.path.join(work_dir, f"upload-{size}.bin")
+            with open(file_name, 'wb') as file:
+                file.write(data)
+            results.append(measure(f"upload_file[{_size_label(size)}]", sink,
+                                   lambda key: storage.upload_file(bucket_name, file_name, key),
+                                   [f"upload/{size}/{index}" for index in range(count)]))
+
+        keys = [f"put/{args.sizes[0]}/{index}" for index in range(min(args.ops, 100))]
+        presign_ops = [keys[index % len(keys)] for index in range(args.ops * 10)]
+        results.append(measure("generate_pre_signed_link[check_exist,cold]", sink,
+                               lambda key: storage.generate_pre_signed_link(bucket_name, key, 600),
+                               presign_ops, cold=True))
+        results.append(measure("generate_pre_signed_link[check_exist,warm]", sink,
+                               lambda key: storage.generate_pre_signed_link(bucket_name, key, 600),
+                               presign_ops, warm_up=True))
+        results.append(measure("generate_pre_signed_link[offline]", sink,
+                               lambda key: storage.generate_pre_signed_link(bucket_name, key, 600, check_exist=False),
+                               presign_ops))
+
+        populated = 0
+        for count in sorted(args.list_keys):
+            list_bucket = f"{bucket_name}-list"
+            if not populated:
+                storage.client.create_bucket(Bucket=list_bucket)
+            # The bucket is filled incrementally, the keys of the previous sizes are kept
+            _populate(storage, list_bucket, populated, count, args.workers)
+            populated = count
+            for workers in args.list_workers:
+                settings.S3_LIST_MAX_WORKERS = workers
+                results.append(measure(f"list_files_by_extension[{count} keys,{workers} workers]", sink,
+                                       lambda _: storage.list_files_by_extension(list_bucket, '.txt',
+                                                                                 include_all_prefix=True),
+                                       range(args.list_runs)))
+
+        delete_bucket = f"{bucket_name}-delete"
+        storage.client.create_bucket(Bucket=delete_bucket)
+        _populate(storage, delete_bucket, 0, args.delete_keys, args.workers)
+        delete_keys = [_key(index) for index in range(args.delete_keys)]
+        results.append(measure(f"delete_object[{args.delete_keys} keys]", sink,
+                               lambda key: storage.delete_object(delete_bucket, key), delete_keys))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def compare(results: list, baseline_file: str):
+    with open(baseline_file) as file:
+        baseline = {result['name']: result for result in json.load(file)['results']}
+    print(f"\nComparison with {baseline_file}")
+    for result in results:
+        before = baseline.get(result['name'])
+        if not before or not before['ops_per_sec']:
+            continue
+        change = (result['ops_per_sec'] / before['ops_per_sec'] - 1) * 100
+        print(f"{result['name']:<44} ops/s {before['ops_per_sec']:>10.1f} -> {result['ops_per_sec']:>10.1f}"
+              f" ({change:+6.1f}%)  rt/call {before['round_trips_per_call']:.2f} -> "
+              f"{result['round_trips_per_call']:.2f}")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', help='Existing S3 compatible endpoint (e.x : http://127.0.0.1:9000/)')
+    parser.add_argument('--access-key', default=ACCESS_KEY)
+    parser.add_argument('--secret-key', default=SECRET_KEY)
+    parser.add_argument('--minio', help='Path of a MinIO binary to start instead of moto')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Object sizes in bytes')
+    parser.add_argument('--ops', type=int, default=100, help='Operations per put/upload/presign scenario')
+    parser.add_argument('--list-keys', type=int, nargs='*', default=[10000],
+                        help='Bucket sizes for the listing scenario (e.x : 10000 100000 1000000)')
+    parser.add_argument('--list-runs', type=int, default=3, help='Listings per bucket size')
+    parser.add_argument('--list-workers', type=int, nargs='+', default=[1, 8],
+                        help='S3_LIST_MAX_WORKERS values of the listing scenario, 1 lists serially')
+    parser.add_argument('--delete-keys', type=int, default=1000, help='Objects deleted one by one')
+    parser.add_argument('--workers', type=int, default=16, help='Threads used to populate the buckets')
+    parser.add_argument('--no-existence-cache', action='store_true', help='Disable the head_bucket/object cache')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--compare', help='Previous --json output to compare with')
+    args = parser.parse_args()
+
+    with StorageServer(args.endpoint, args.minio) as server:
+        configure(server.endpoint, args.access_key, args.secret_key, not args.no_existence_cache)
+        results = run(args)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                'benchmark': 's3',
+                'server': server.kind,
+                'revision': _git_revision(),
+                'python': platform.python_version(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'arguments': {key: value for key, value in vars(args).items() if key not in ('json', 'compare', 'access_key', 'secret_key')},
+                'results': results,
+            }, file, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
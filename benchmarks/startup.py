@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Measures the start up cost of s3lib in fresh interpreters: import of s3lib.lib, BotoMinio() construction,
+first client build and the first (offline) pre-signed link. No storage server is needed.
+
+    python benchmarks/startup.py --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {src!r})
+from django.conf import settings
+settings.configure(STORAGE_SERVICE='s3', S3_ACCESS_KEY='access', S3_SECRET_KEY='secret',
+                   S3_INTERNAL_HOST_URL='http://127.0.0.1:9000/', S3_EXTERNAL_HOST_URL='http://127.0.0.1:9000/',
+                   USE_S3_EXTERNAL_CLIENT=False, STORAGE_VERSION='s3v4', DEFAULT_S3_LINK_EXPIRY_TIMEOUT=3600)
+timings = {{}}
+start = time.perf_counter()
+from s3lib.lib import BotoMinio
+timings['import'] = time.perf_counter() - start
+start = time.perf_counter()
+storage = BotoMinio()
+timings['construct'] = time.perf_counter() - start
+start = time.perf_counter()
+storage.client
+timings['first_client'] = time.perf_counter() - start
+start = time.perf_counter()
+storage.generate_pre_signed_link('bucket', 'key.txt', 60, check_exist=False)
+timings['first_presign'] = time.perf_counter() - start
+start = time.perf_counter()
+BotoMinio().generate_pre_signed_link('bucket', 'key.txt', 60, check_exist=False)
+timings['second_instance_presign'] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def run_once() -> dict:
+    code = CHILD.format(src=os.path.join(ROOT, 'src'))
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreters')
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    results = {}
+    for name in runs[0]:
+        values = sorted(run[name] for run in runs)
+        results[name] = {'median_ms': statistics.median(values) * 1000, 'min_ms': values[0] * 1000,
+                         'max_ms': values[-1] * 1000}
+        print(f"{name:<26} median {results[name]['median_ms']:8.2f} ms   min {results[name]['min_ms']:8.2f} ms")
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'benchmark': 'startup', 'runs': args.runs, 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
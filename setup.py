@@ -39,6 +39,9 @@ setup(
         "boto3",
         "Django>=3",
     ),
+    extras_require={
+        "async": ["aiobotocore"],
+    },
     zip_safe=False,
     include_package_data=True,
 )
\ No newline at end of file
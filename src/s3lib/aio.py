@@ -0,0 +1,413 @@
+import asyncio
+import logging
+import os
+from contextlib import AsyncExitStack
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+from .cache import existence_cache, object_cache, presigned_url_cache
+from .clients import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from .metrics import register_client_hooks
+from .resilience import register_resilience_hooks, retry_config
+from .transfer import get_transfer_config
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+except ImportError:  # pragma: no cover
+    AioConfig = get_session = None
+
+logger = logging.getLogger("s3lib")
+EMPTY_STRING = ""
+DEFAULT_ASYNC_MAX_CONCURRENCY = 100
+_session = None
+
+
+def _get_session():
+    # Creating a session loads the service models, it is done once per process and shared by every client
+    global _session
+    if _session is None:
+        _session = get_session()
+    return _session
+
+
+class AsyncBotoMinio:
+    """
+    asyncio counterpart of BotoMinio, built on aiobotocore (pip install s3lib[async]).
+    A single client, and so a single pooled HTTP session, is created on first use and shared by every call made
+    through the instance. At most max_concurrency requests are in flight at any time, so callers can
+    asyncio.gather hundreds of operations. Use it as an async context manager, or call close() when done.
+    Connections are only reused by the calls of one instance, so keep a long lived instance per event loop
+    (e.x : created at application startup and closed at shutdown) rather than one per request.
+
+    e.x :
+        async with AsyncBotoMinio() as s3:
+            links = await asyncio.gather(*(s3.generate_pre_signed_link(bucket, key, 60) for key in keys))
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        if get_session is None:
+            raise ImportError("aiobotocore is required for AsyncBotoMinio, install it with pip install s3lib[async]")
+        self.storage = settings.STORAGE_SERVICE
+        self.access_key = settings.S3_ACCESS_KEY
+        self.secret_key = settings.S3_SECRET_KEY
+        self.hostname = settings.S3_INTERNAL_HOST_URL
+        self.version = settings.STORAGE_VERSION
+        self.external_host = settings.S3_EXTERNAL_HOST_URL if settings.USE_S3_EXTERNAL_CLIENT else settings.S3_INTERNAL_HOST_URL
+        self.max_concurrency = max_concurrency or getattr(settings, 'S3_ASYNC_MAX_CONCURRENCY',
+                                                          DEFAULT_ASYNC_MAX_CONCURRENCY)
+        # asyncio primitives are created inside the running loop (they bind to the loop of their creation on 3.9)
+        self._semaphore = None
+        self._client_lock = None
+        self._exit_stack = AsyncExitStack()
+        self._client = None
+        self._external_client = None
+
+    async def __aenter__(self):
+        await self._get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the clients and their HTTP session.
+        """
+        await self._exit_stack.aclose()
+        self._client = None
+        self._external_client = None
+        self._semaphore = None
+        self._client_lock = None
+
+    async def _create_client(self, endpoint_url: str):
+        config = AioConfig(signature_version=self.version,
+                           max_pool_connections=self.max_concurrency,
+                           connect_timeout=getattr(settings, 'S3_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+                           read_timeout=getattr(settings, 'S3_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+                           retries=retry_config())
+        client = await self._exit_stack.enter_async_context(
+            _get_session().create_client(self.storage,
+                                         endpoint_url=endpoint_url,
+                                         aws_access_key_id=self.access_key,
+                                         aws_secret_access_key=self.secret_key,
+                                         config=config))
+        register_client_hooks(client)
+        register_resilience_hooks(client, endpoint_url)
+        return client
+
+    async def _get_client(self):
+        if self._client is None:
+            if self._client_lock is None:
+                self._client_lock = asyncio.Lock()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            async with self._client_lock:
+                if self._client is None:
+                    client = await self._create_client(self.hostname)
+                    if self.external_host == self.hostname:
+                        self._external_client = client
+                    else:
+                        self._external_client = await self._create_client(self.external_host)
+                    self._client = client
+        return self._client
+
+    async def _call(self, operation: str, **kwargs):
+        client = await self._get_client()
+        async with self._semaphore:
+            return await getattr(client, operation)(**kwargs)
+
+    async def check_bucket_exist(self, bucket_name: str) -> bool:
+        """
+        This function is used to check whether specified bucket exists or not.
+        @param bucket_name: S3 Bucket Name
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        cached = existence_cache.get_bucket(self.hostname, bucket_name)
+        if cached is not None:
+            return cached
+        try:
+            response = await self._call('head_bucket', Bucket=bucket_name)
+            exists = response['ResponseMetadata']['HTTPStatusCode'] == 200
+            existence_cache.set_bucket(self.hostname, bucket_name, exists)
+            return exists
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Checking Bucket Exists (check_bucket_exist) : {e}")
+            if e.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                existence_cache.set_bucket(self.hostname, bucket_name, False)
+            return False
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Checking Bucket Exists (check_bucket_exist) : {e}")
+            return False
+
+    async def check_object_exist(self, bucket_name: str, object_path: str) -> bool:
+        """
+        Helper method to verify if the specified  file exists in the specified bucket or not.
+        @param bucket_name: S3 Bucket Name
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file is stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        cached = existence_cache.get_object(self.hostname, bucket_name, object_path)
+        if cached is not None:
+            return cached
+        try:
+            response = await self._call('head_object', Bucket=bucket_name, Key=object_path)
+            exists = response['ResponseMetadata']['HTTPStatusCode'] == 200
+            existence_cache.set_object(self.hostname, bucket_name, object_path, exists)
+            return exists
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Checking Bucket Exists (check_object_exist) : {e}")
+            if e.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                existence_cache.set_object(self.hostname, bucket_name, object_path, False)
+            return False
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Checking Bucket Exists (check_object_exist) : {e}")
+            return False
+
+    async def generate_pre_signed_link(self,
+                                       bucket_name: str,
+                                       object_path: str,
+                                       expires_in: int,
+                                       check_exist: bool = True) -> str:
+        """
+        Generates the pre-signed link for the specified object in the S3 Bucket
+        @param bucket_name: S3 Bucket Name
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file is stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @param expires_in: Expiry Time in seconds
+        @param check_exist: True - Verifies that the bucket and object exist before signing
+                            False - Signs the link locally without any network call
+        @return: Success - Returns Pre-Signed link of the object
+                 Failure - Returns Empty String
+        """
+        try:
+            if check_exist and not (await self.check_bucket_exist(bucket_name) and
+                                    await self.check_object_exist(bucket_name, object_path)):
+                logger.debug("Failed to Generate Pre-signed link for the specified File")
+                return EMPTY_STRING
+            url = presigned_url_cache.get(self.external_host, bucket_name, object_path, expires_in)
+            if url is None:
+                await self._get_client()
+                url = await self._external_client.generate_presigned_url('get_object',
+                                                                         Params={
+                                                                             'Bucket': bucket_name,
+                                                                             'Key': object_path
+                                                                         },
+                                                                         ExpiresIn=expires_in)
+                presigned_url_cache.set(self.external_host, bucket_name, object_path, expires_in, url)
+            return url
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Generating Pre-signed Link : {e}")
+            return EMPTY_STRING
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Generating Pre-signed Link : {e}")
+            return EMPTY_STRING
+
+    async def put_object(self, bucket_name: str, data: bytes, object_path: str, content_type='octet/stream') -> bool:
+        """
+        This function Adds an object to a bucket.
+        You must have WRITE permissions on a bucket to add an object to it.
+        @param content_type: MIME Type of the file
+        @param bucket_name: S3 Bucket name
+        @param data: bytes
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file needs to be stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @return: Success - True
+                 Failure - False
+        """
+        try:
+            response = await self._call('put_object', Bucket=bucket_name, Key=object_path, Body=data,
+                                        ContentType=content_type)
+            success = response['ResponseMetadata']['HTTPStatusCode'] == 200
+            if success:
+                existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+                if isinstance(data, (bytes, bytearray)):
+                    object_cache.set(self.hostname, bucket_name, object_path, response.get('ETag'), data)
+                else:
+                    object_cache.invalidate(self.hostname, bucket_name, object_path)
+            else:
+                existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+                object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return success
+        except ClientError as error:
+            logger.exception(f"Client Error Occured During PUT Object (put_object): {error}")
+            existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return False
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During PUT Object (put_object): {e}")
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return False
+
+    async def upload_file(self,
+                          bucket_name: str,
+                          file_name,
+                          object_path: str,
+                          content_type='octet/stream',
+                          transfer_config=None) -> bool:
+        """
+        This function is used to upload file to specified bucket .
+        Files above multipart_threshold are sent as a multipart upload, max_concurrency parts at a time.
+        Local file reads are done in the default executor so they never block the event loop.
+        @param content_type: MIME Type of the file.(By default it's considered as octet/stream)
+        @param transfer_config: TransferConfig or dict overriding the multipart settings (see get_transfer_config)
+        @param bucket_name: S3 Bucket Name
+        @param file_name: File to be uploaded to S3 Bucket ( File Must be present locally, and it can take file_name/
+                          file_path)
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file needs to be stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        logger.debug("Uploading File: %s to Bucket: %s with path: %s , MIME: %s",
+                     file_name, bucket_name, object_path, content_type)
+        if not (await self.check_bucket_exist(bucket_name) and os.path.exists(file_name)):
+            logger.error("Failed to Upload file to the Specified Bucket (upload_file)")
+            return False
+        config = get_transfer_config(transfer_config)
+        loop = asyncio.get_running_loop()
+        try:
+            size = os.path.getsize(file_name)
+            if size < config.multipart_threshold:
+                data = await loop.run_in_executor(None, _read_range, file_name, 0, size)
+                return await self.put_object(bucket_name, data, object_path, content_type)
+            await self._multipart_upload_file(bucket_name, file_name, object_path, content_type, size, config)
+            existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return True
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Upload File (upload_file) : {e}")
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Upload File (upload_file) : {e}")
+        existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+        object_cache.invalidate(self.hostname, bucket_name, object_path)
+        return False
+
+    async def _multipart_upload_file(self, bucket_name: str, file_name: str, object_path: str, content_type: str,
+                                     size: int, config):
+        loop = asyncio.get_running_loop()
+        chunk_size = config.multipart_chunksize
+        parts_limit = asyncio.Semaphore(config.max_request_concurrency)
+        response = await self._call('create_multipart_upload', Bucket=bucket_name, Key=object_path,
+                                    ContentType=content_type)
+        upload_id = response['UploadId']
+
+        async def _upload_part(part_number, start):
+            async with parts_limit:
+                data = await loop.run_in_executor(None, _read_range, file_name, start, min(chunk_size, size - start))
+                part = await self._call('upload_part', Bucket=bucket_name, Key=object_path, UploadId=upload_id,
+                                        PartNumber=part_number, Body=data)
+                return {'PartNumber': part_number, 'ETag': part['ETag']}
+
+        try:
+            parts = await asyncio.gather(*(_upload_part(number, start) for number, start in
+                                           enumerate(range(0, size, chunk_size), start=1)))
+            await self._call('complete_multipart_upload', Bucket=bucket_name, Key=object_path, UploadId=upload_id,
+                             MultipartUpload={'Parts': list(parts)})
+        except BaseException:
+            await self._call('abort_multipart_upload', Bucket=bucket_name, Key=object_path, UploadId=upload_id)
+            raise
+
+    async def delete_object(self, bucket_name: str, object_path: str) -> bool:
+        """
+        This function is used to delete object from the specified bucket.
+        @param bucket_name: S3 Bucket Name
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file is stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        try:
+            logger.warning("Deleting a File from Bucket: %s with path: %s", bucket_name, object_path)
+            if await self.check_bucket_exist(bucket_name) and await self.check_object_exist(bucket_name, object_path):
+                response = await self._call('delete_object', Bucket=bucket_name, Key=object_path)
+                success = response['ResponseMetadata']['HTTPStatusCode'] == 204
+                if success:
+                    existence_cache.set_object(self.hostname, bucket_name, object_path, False)
+                else:
+                    existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+                object_cache.invalidate(self.hostname, bucket_name, object_path)
+                return success
+            else:
+                logger.debug("While Deleting File : Bucket/ File Doesn't Exists")
+                return False
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Deleting File (delete_object) : {e}")
+            existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return False
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Deleting File (delete_object) : {e}")
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return False
+
+    async def iter_objects(self,
+                           bucket_name: str,
+                           prefix: str = None,
+                           suffixes=None,
+                           recursive: bool = True,
+                           start_after: str = None,
+                           max_results: int = None,
+                           page_size: int = 1000):
+        """
+        Lazily lists the objects of the S3 Bucket, one ListObjectsV2 page at a time (async generator).
+        Same parameters as BotoMinio.iter_objects, ClientError is raised to the caller.
+        @return: Async generator of the object dicts returned by ListObjectsV2 (Key, Size, ETag, LastModified ...)
+        """
+        if isinstance(suffixes, list):
+            suffixes = tuple(suffixes)
+        params = {'Bucket': bucket_name, 'PaginationConfig': {'PageSize': page_size}}
+        if prefix:
+            params['Prefix'] = prefix
+        if not recursive:
+            params['Delimiter'] = '/'
+        if start_after:
+            params['StartAfter'] = start_after
+        client = await self._get_client()
+        pages = client.get_paginator('list_objects_v2').paginate(**params).__aiter__()
+        count = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    page = await pages.__anext__()
+                except StopAsyncIteration:
+                    return
+            for obj in page.get('Contents', ()):
+                if suffixes and not obj['Key'].endswith(suffixes):
+                    continue
+                yield obj
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+
+    async def list_files_by_extension(self, bucket_name: str, file_extension, prefix: str = None,
+                                      include_all_prefix: bool = False) -> list:
+        """
+        Lists all the objects from S3 Bucket by given file_extension.
+        Same behaviour as BotoMinio.list_files_by_extension.
+        @param include_all_prefix: True - Checks inside the all the folders(prefix) present in that particular bucket
+        @param file_extension: File Extensions to be searched
+        @param prefix: Folder prefix
+        @param bucket_name: Bucket Name
+        @return: List of {'Key': object_path}, Empty list if nothing is found or on failure
+        """
+        if not await self.check_bucket_exist(bucket_name) or (prefix is not None and include_all_prefix):
+            logger.info("Bucket Does not Exists or Invalid Parameters Passed")
+            return []
+        recursive = prefix is not None or include_all_prefix
+        try:
+            return [{'Key': obj['Key']} async for obj in self.iter_objects(bucket_name, prefix=prefix,
+                                                                            suffixes=file_extension,
+                                                                            recursive=recursive)]
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Listing Files (list_files_by_extension) : {e}")
+            return []
+
+
+def _read_range(file_name: str, start: int, size: int) -> bytes:
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        return file.read(size)
@@ -0,0 +1,475 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import cached_property
+
+from django.conf import settings
+
+from .metrics import record_cache
+
+DEFAULT_EXISTENCE_CACHE_TTL = 30
+DEFAULT_EXISTENCE_CACHE_NEGATIVE_TTL = 5
+DEFAULT_EXISTENCE_CACHE_MAX_SIZE = 10000
+DEFAULT_PRESIGNED_URL_CACHE_MAX_AGE_RATIO = 0.1
+DEFAULT_PRESIGNED_URL_CACHE_MAX_SIZE = 10000
+DEFAULT_OBJECT_CACHE_MAX_OBJECT_SIZE = 1024 * 1024
+DEFAULT_OBJECT_CACHE_MEMORY_SIZE = 64 * 1024 * 1024
+DEFAULT_OBJECT_CACHE_DISK_SIZE = 1024 * 1024 * 1024
+DEFAULT_OBJECT_CACHE_REVALIDATE_AFTER = 0
+OBJECT_CACHE_MAX_TRACKED_CHANGES = 10000
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread safe LRU cache where every entry carries its own expiry time.
+    """
+
+    def __init__(self, max_size: int, name: str = None):
+        self.max_size = max_size
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for the key, or default if it is missing or expired.
+        @param key: Cache Key
+        @param default: Value returned on a miss
+        @return: Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    hit = True
+                else:
+                    del self._data[key]
+                    hit = False
+            else:
+                hit = False
+            if not hit:
+                self.misses += 1
+        if self.name:
+            record_cache(self.name, hit)
+        return value if hit else default
+
+    def set(self, key, value, ttl: float):
+        """
+        Stores the value for ttl seconds, evicting the least recently used entries above max_size.
+        @param key: Cache Key
+        @param value: Value to be cached
+        @param ttl: Time to live in seconds, entries with ttl <= 0 are not stored
+        """
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExistenceCache:
+    """
+    Caches the results of head_bucket/head_object calls.
+    Positive and negative (404) results are kept for S3_EXISTENCE_CACHE_TTL and S3_EXISTENCE_CACHE_NEGATIVE_TTL
+    seconds respectively. Setting S3_EXISTENCE_CACHE_ENABLED = False disables the cache.
+    Settings are read on first use, so the module can be imported before Django settings are configured.
+    """
+
+    @cached_property
+    def enabled(self):
+        return getattr(settings, 'S3_EXISTENCE_CACHE_ENABLED', True)
+
+    @cached_property
+    def ttl(self):
+        return getattr(settings, 'S3_EXISTENCE_CACHE_TTL', DEFAULT_EXISTENCE_CACHE_TTL)
+
+    @cached_property
+    def negative_ttl(self):
+        return getattr(settings, 'S3_EXISTENCE_CACHE_NEGATIVE_TTL', DEFAULT_EXISTENCE_CACHE_NEGATIVE_TTL)
+
+    @cached_property
+    def _cache(self):
+        return TTLCache(getattr(settings, 'S3_EXISTENCE_CACHE_MAX_SIZE', DEFAULT_EXISTENCE_CACHE_MAX_SIZE),
+                        name='existence')
+
+    def get_bucket(self, endpoint: str, bucket_name: str):
+        """
+        @return: True/False if cached, None otherwise
+        """
+        if not self.enabled:
+            return None
+        return self._cache.get((endpoint, bucket_name))
+
+    def set_bucket(self, endpoint: str, bucket_name: str, exists: bool):
+        if self.enabled:
+            self._cache.set((endpoint, bucket_name), exists, self.ttl if exists else self.negative_ttl)
+
+    def get_object(self, endpoint: str, bucket_name: str, object_path: str):
+        """
+        @return: True/False if cached, None otherwise
+        """
+        if not self.enabled:
+            return None
+        return self._cache.get((endpoint, bucket_name, object_path))
+
+    def set_object(self, endpoint: str, bucket_name: str, object_path: str, exists: bool):
+        if not self.enabled:
+            return
+        self._cache.set((endpoint, bucket_name, object_path), exists, self.ttl if exists else self.negative_ttl)
+        if exists:
+            # An object can only exist inside an existing bucket.
+            self.set_bucket(endpoint, bucket_name, True)
+
+    def invalidate_object(self, endpoint: str, bucket_name: str, object_path: str):
+        self._cache.delete((endpoint, bucket_name, object_path))
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+
+existence_cache = ExistenceCache()
+
+
+class PresignedUrlCache:
+    """
+    Reuses a still valid pre-signed URL instead of signing it again.
+    The signature does not depend on the object content, so writes and deletes do not need to invalidate it.
+    Signing times are quantized into windows of expires_in * S3_PRESIGNED_URL_CACHE_MAX_AGE_RATIO seconds, and a
+    URL is only reused within the window it was signed in, so every returned URL stays valid for at least
+    expires_in minus the window width. Entries are keyed by (endpoint, bucket, key, expires_in, window).
+    Disabled unless S3_PRESIGNED_URL_CACHE_ENABLED = True.
+    Settings are read on first use.
+    """
+
+    @cached_property
+    def enabled(self):
+        return getattr(settings, 'S3_PRESIGNED_URL_CACHE_ENABLED', False)
+
+    @cached_property
+    def max_age_ratio(self):
+        return getattr(settings, 'S3_PRESIGNED_URL_CACHE_MAX_AGE_RATIO', DEFAULT_PRESIGNED_URL_CACHE_MAX_AGE_RATIO)
+
+    def _window(self, expires_in: int):
+        """
+        @return: (index of the current signing window, seconds left in it), or None if links are too short lived
+                 to be reused
+        """
+        width = expires_in * self.max_age_ratio
+        if width < 1:
+            return None
+        now = time.time()
+        index = int(now // width)
+        return index, (index + 1) * width - now
+
+    @cached_property
+    def _cache(self):
+        return TTLCache(getattr(settings, 'S3_PRESIGNED_URL_CACHE_MAX_SIZE', DEFAULT_PRESIGNED_URL_CACHE_MAX_SIZE),
+                        name='presigned_url')
+
+    def get(self, endpoint: str, bucket_name: str, object_path: str, expires_in: int):
+        """
+        @return: Cached pre-signed URL or None
+        """
+        if not self.enabled:
+            return None
+        window = self._window(expires_in)
+        if window is None:
+            return None
+        return self._cache.get((endpoint, bucket_name, object_path, expires_in, window[0]))
+
+    def set(self, endpoint: str, bucket_name: str, object_path: str, expires_in: int, url: str):
+        """
+        Stores a URL that was just signed, until the end of the current signing window.
+        """
+        if not self.enabled:
+            return
+        window = self._window(expires_in)
+        if window is not None:
+            index, remaining = window
+            self._cache.set((endpoint, bucket_name, object_path, expires_in, index), url, remaining)
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+
+presigned_url_cache = PresignedUrlCache()
+
+
+class CachedObject:
+    """
+    Content of an object with its ETag, as kept by the ObjectCache.
+    """
+    __slots__ = ('etag', 'data', 'validated_at')
+
+    def __init__(self, etag: str, data: bytes, validated_at: float = 0.0):
+        self.etag = etag
+        self.data = data
+        self.validated_at = validated_at
+
+
+class ObjectCache:
+    """
+    Two tier cache of the content of small objects read with get_object_bytes.
+    Objects up to S3_OBJECT_CACHE_MAX_OBJECT_SIZE bytes are kept in an in-process LRU bounded to
+    S3_OBJECT_CACHE_MEMORY_SIZE bytes. Entries evicted from memory are spilled to S3_OBJECT_CACHE_DIR (if set),
+    an on-disk LRU bounded to S3_OBJECT_CACHE_DISK_SIZE bytes per process. Disk hits are served from a read only
+    mapping of the file (the content is only copied into the caller's buffer) and stay on disk.
+    Every hit is revalidated with a conditional GET (If-None-Match) unless it was validated less than
+    S3_OBJECT_CACHE_REVALIDATE_AFTER seconds ago, disk hits are always revalidated.
+    Disabled unless S3_OBJECT_CACHE_ENABLED = True.
+    Every store and invalidation of a key is numbered, so the content of a read is not stored over a write or
+    invalidation that happened after the read started (see start_read).
+    Settings are read on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = None
+        self._disk_bytes = 0
+        self._sequence = 0
+        # Sequence of the last change of the most recently changed keys. Keys dropped from it are only known to
+        # have changed at or before _changes_floor.
+        self._changes = OrderedDict()
+        self._changes_floor = 0
+
+    @cached_property
+    def enabled(self):
+        return getattr(settings, 'S3_OBJECT_CACHE_ENABLED', False)
+
+    @cached_property
+    def max_object_size(self):
+        return getattr(settings, 'S3_OBJECT_CACHE_MAX_OBJECT_SIZE', DEFAULT_OBJECT_CACHE_MAX_OBJECT_SIZE)
+
+    @cached_property
+    def memory_size(self):
+        return getattr(settings, 'S3_OBJECT_CACHE_MEMORY_SIZE', DEFAULT_OBJECT_CACHE_MEMORY_SIZE)
+
+    @cached_property
+    def directory(self):
+        return getattr(settings, 'S3_OBJECT_CACHE_DIR', None)
+
+    @cached_property
+    def disk_size(self):
+        return getattr(settings, 'S3_OBJECT_CACHE_DISK_SIZE', DEFAULT_OBJECT_CACHE_DISK_SIZE)
+
+    @cached_property
+    def revalidate_after(self):
+        return getattr(settings, 'S3_OBJECT_CACHE_REVALIDATE_AFTER', DEFAULT_OBJECT_CACHE_REVALIDATE_AFTER)
+
+    @staticmethod
+    def _file_name(key: tuple) -> str:
+        return hashlib.sha256('\0'.join(key).encode()).hexdigest()
+
+    def get(self, endpoint: str, bucket_name: str, object_path: str):
+        """
+        @return: CachedObject from the memory or disk tier, None on a miss
+        """
+        if not self.enabled:
+            return None
+        key = (endpoint, bucket_name, object_path)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self.directory:
+                file_name = self._file_name(key)
+                if file_name in self._load_disk_index():
+                    self._disk.move_to_end(file_name)
+                    entry = self._read_file(file_name)
+        record_cache('object', entry is not None)
+        return entry
+
+    def is_fresh(self, entry: CachedObject) -> bool:
+        """
+        @return: True if the entry can be used without revalidating it with the storage server
+        """
+        return time.monotonic() - entry.validated_at < self.revalidate_after
+
+    def mark_validated(self, entry: CachedObject):
+        entry.validated_at = time.monotonic()
+
+    def start_read(self) -> int:
+        """
+        To be called before fetching an object whose content is then stored with set(..., read_sequence).
+        @return: Sequence number of the last change made to the cache
+        """
+        with self._lock:
+            return self._sequence
+
+    def set(self, endpoint: str, bucket_name: str, object_path: str, etag: str, data: bytes,
+            read_sequence: int = None):
+        """
+        Stores the content of an object, objects larger than max_object_size (or without ETag) are not cached and
+        their previous entry is dropped.
+        @param read_sequence: Value of start_read() taken before the content was fetched, the content is not stored
+                              if the object was stored or invalidated since. None for writes, which always store.
+        """
+        if not self.enabled:
+            return
+        if not etag or len(data) > self.max_object_size:
+            self.invalidate(endpoint, bucket_name, object_path)
+            return
+        key = (endpoint, bucket_name, object_path)
+        with self._lock:
+            if read_sequence is not None and self._changes.get(key, self._changes_floor) > read_sequence:
+                return
+            self._record_change(key)
+            self._remove_file(self._file_name(key))
+            self._store_in_memory(key, CachedObject(etag, bytes(data), time.monotonic()))
+
+    def invalidate(self, endpoint: str, bucket_name: str, object_path: str):
+        if not self.enabled:
+            return
+        key = (endpoint, bucket_name, object_path)
+        with self._lock:
+            self._record_change(key)
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry.data)
+            self._remove_file(self._file_name(key))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for file_name in list(self._disk or ()):
+                self._remove_file(file_name)
+
+    # The helpers below are called with the lock held.
+
+    def _record_change(self, key: tuple):
+        self._sequence += 1
+        self._changes[key] = self._sequence
+        self._changes.move_to_end(key)
+        while len(self._changes) > OBJECT_CACHE_MAX_TRACKED_CHANGES:
+            _, self._changes_floor = self._changes.popitem(last=False)
+
+    def _store_in_memory(self, key: tuple, entry: CachedObject):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous.data)
+        self._memory[key] = entry
+        self._memory_bytes += len(entry.data)
+        while self._memory_bytes > self.memory_size and self._memory:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.data)
+            if self.directory:
+                self._write_file(self._file_name(evicted_key), evicted)
+
+    def _load_disk_index(self) -> OrderedDict:
+        # Files left by a previous run are reused, least recently modified first
+        if self._disk is None:
+            os.makedirs(self.directory, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+            self._disk = OrderedDict((name, size) for _, name, size in sorted(files))
+            self._disk_bytes = sum(self._disk.values())
+            self._evict_disk()
+        return self._disk
+
+    def _read_file(self, file_name: str):
+        # The data is a view of the mapping, which is unmapped once the entry is collected. A file replaced or
+        # removed meanwhile stays readable through the mapping.
+        try:
+            with open(os.path.join(self.directory, file_name), 'rb') as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            separator = mapped.find(b'\n')
+            if separator < 0:
+                mapped.close()
+                raise ValueError(f"Corrupted object cache file {file_name}")
+            return CachedObject(mapped[:separator].decode(), memoryview(mapped)[separator + 1:])
+        except (OSError, ValueError):
+            self._remove_file(file_name)
+            return None
+
+    def _write_file(self, file_name: str, entry: CachedObject):
+        index = self._load_disk_index()
+        if file_name in index:
+            index.move_to_end(file_name)
+            return
+        try:
+            descriptor, temp_name = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(entry.etag.encode() + b'\n')
+                file.write(entry.data)
+            os.replace(temp_name, os.path.join(self.directory, file_name))
+        except OSError:
+            return
+        index[file_name] = len(entry.etag) + 1 + len(entry.data)
+        self._disk_bytes += index[file_name]
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.disk_size and self._disk:
+            self._remove_file(next(iter(self._disk)))
+
+    def _remove_file(self, file_name: str):
+        if not self.directory:
+            return
+        size = self._load_disk_index().pop(file_name, None)
+        if size is None:
+            return
+        self._disk_bytes -= size
+        try:
+            os.remove(os.path.join(self.directory, file_name))
+        except OSError:
+            pass
+
+    @property
+    def memory_bytes(self):
+        return self._memory_bytes
+
+    @property
+    def disk_bytes(self):
+        return self._disk_bytes
+
+
+object_cache = ObjectCache()
@@ -0,0 +1,154 @@
+import os
+import threading
+import logging
+
+from django.conf import settings
+
+from .metrics import register_client_hooks
+from .resilience import register_resilience_hooks, retry_config
+
+logger = logging.getLogger("s3lib")
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_TCP_KEEPALIVE = True
+
+
+class ClientPool:
+    """
+    Process wide registry of boto3 sessions, clients and resources.
+    Each client is built once per (service, endpoint, credentials, signature version) and then shared, so that
+    botocore service models are loaded once and all BotoMinio instances reuse the same urllib3 connection pool.
+    Clients are thread safe; creation is serialised with a lock as boto3 sessions are not.
+    After os.fork() the registry is emptied in the child, so prefork workers (gunicorn/celery) never share sockets
+    with their parent.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._clients = {}
+        self._resources = {}
+        self._pid = os.getpid()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """
+        Drops everything built in the parent process. The lock is recreated as it may have been held while forking.
+        """
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._clients = {}
+        self._resources = {}
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        # Fallback for platforms without os.register_at_fork
+        if self._pid != os.getpid():
+            self._after_fork()
+
+    @staticmethod
+    def build_config(signature_version: str, timeouts: tuple = None):
+        """
+        Builds the botocore Config used by every pooled client, tunable from Django settings.
+        @param signature_version: Signature version used to sign the requests
+        @param timeouts: (connect_timeout, read_timeout) overriding S3_CONNECT_TIMEOUT and S3_READ_TIMEOUT
+        @return: botocore Config
+        """
+        from botocore.config import Config
+
+        connect_timeout, read_timeout = timeouts or (getattr(settings, 'S3_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+                                                     getattr(settings, 'S3_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+        return Config(signature_version=signature_version,
+                      max_pool_connections=getattr(settings, 'S3_MAX_POOL_CONNECTIONS',
+                                                   DEFAULT_MAX_POOL_CONNECTIONS),
+                      connect_timeout=connect_timeout,
+                      read_timeout=read_timeout,
+                      tcp_keepalive=getattr(settings, 'S3_TCP_KEEPALIVE', DEFAULT_TCP_KEEPALIVE),
+                      retries=retry_config())
+
+    def _get_session(self, access_key: str, secret_key: str):
+        key = (access_key, secret_key)
+        session = self._sessions.get(key)
+        if session is None:
+            # boto3 is imported on first use, it is the bulk of the import time of s3lib
+            import boto3.session
+
+            session = boto3.session.Session(aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+            self._sessions[key] = session
+        return session
+
+    def get_client(self, service: str, endpoint_url: str, access_key: str, secret_key: str, signature_version: str,
+                   timeouts: tuple = None):
+        """
+        Returns the shared low level client for the given endpoint and credentials, building it on first use.
+        Every client is guarded by the circuit breaker of its endpoint.
+        @param service: Service name (e.x : 's3')
+        @param endpoint_url: Endpoint URL of the storage server
+        @param access_key: Access Key
+        @param secret_key: Secret Key
+        @param signature_version: Signature version used to sign the requests
+        @param timeouts: (connect_timeout, read_timeout) of the client, None for the default ones
+        @return: boto3 client
+        """
+        self._check_pid()
+        key = (service, endpoint_url, access_key, secret_key, signature_version, timeouts)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                logger.debug("Creating pooled %s client for endpoint : %s", service, endpoint_url)
+                session = self._get_session(access_key, secret_key)
+                client = session.client(service,
+                                        endpoint_url=endpoint_url,
+                                        config=self.build_config(signature_version, timeouts))
+                register_client_hooks(client)
+                register_resilience_hooks(client, endpoint_url)
+                self._clients[key] = client
+            return client
+
+    def get_resource(self, service: str, endpoint_url: str, access_key: str, secret_key: str, signature_version: str):
+        """
+        Returns the shared service resource for the given endpoint and credentials, building it on first use.
+        The resource is only used as a factory for Bucket/Object sub resources (which are created per call), and
+        its underlying client is the pooled one, so sharing it across threads is safe.
+        @param service: Service name (e.x : 's3')
+        @param endpoint_url: Endpoint URL of the storage server
+        @param access_key: Access Key
+        @param secret_key: Secret Key
+        @param signature_version: Signature version used to sign the requests
+        @return: boto3 service resource
+        """
+        self._check_pid()
+        key = (service, endpoint_url, access_key, secret_key, signature_version, None)
+        resource = self._resources.get(key)
+        if resource is not None:
+            return resource
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is None:
+                client = self.get_client(service, endpoint_url, access_key, secret_key, signature_version)
+                session = self._get_session(access_key, secret_key)
+                resource = session.resource(service,
+                                            endpoint_url=endpoint_url,
+                                            config=self.build_config(signature_version))
+                # Share the pooled client (and its connection pool) instead of the one built by the resource.
+                resource.meta.client = client
+                self._resources[key] = resource
+            return resource
+
+    def clear(self):
+        """
+        Drops all the pooled sessions, clients and resources. Next call rebuilds them (e.x : after settings change)
+        """
+        with self._lock:
+            self._sessions = {}
+            self._clients = {}
+            self._resources = {}
+
+
+client_pool = ClientPool()
@@ -0,0 +1,40 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_BULK_MAX_WORKERS = 8
+
+
+def bounded_map(fn, items, max_workers: int, max_pending: int = None, thread_name_prefix: str = 's3lib'):
+    """
+    Runs fn on every item on a thread pool, without ever holding more than max_pending submitted items.
+    The items iterable is consumed lazily, so a generator input (e.x : a paginated listing) keeps memory flat.
+    Each call runs in a copy of the caller's context (contextvars), so metrics are attributed to the caller.
+    @param fn: Callable taking a single item
+    @param items: Iterable of items
+    @param max_workers: Number of threads
+    @param max_pending: Maximum number of submitted but not yet consumed items (Default 2 * max_workers)
+    @param thread_name_prefix: Prefix of the worker thread names
+    @return: Generator of (item, result, exception) tuples in completion order, exception is None on success
+    """
+    max_pending = max_pending or max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix) as executor:
+        pending = {}
+        try:
+            for item in items:
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield _outcome(pending.pop(future), future)
+                pending[executor.submit(contextvars.copy_context().run, fn, item)] = item
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _outcome(pending.pop(future), future)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _outcome(item, future):
+    error = future.exception()
+    return item, None if error is not None else future.result(), error
@@ -1,11 +1,62 @@
+import contextvars
+import mmap
 import os
-import boto3
+import queue
+import stat
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from botocore.exceptions import ClientError
 import logging
 from django.conf import settings
 
+from .cache import existence_cache, object_cache, presigned_url_cache
+from .clients import client_pool
+from .metrics import instrumented
+from .resilience import operation_timeouts
+from .concurrency import bounded_map, DEFAULT_BULK_MAX_WORKERS
+from .reader import get_range_into, readinto_fully, S3ObjectReader, DEFAULT_READ_AHEAD
+from .transfer import copy_part_ranges, get_copy_multipart_threshold, get_transfer_config, IterableStream, \
+    DEFAULT_TRANSFER_MAX_CONCURRENCY
+
 logger = logging.getLogger("s3lib")
 EMPTY_STRING = ""
+DEFAULT_LIST_MAX_WORKERS = 8
+LIST_SAMPLE_MAX_DEPTH = 16
+# Sorts after any other character (S3 orders keys by their UTF-8 bytes, i.e. by code point)
+_MAX_KEY_CHAR = '\U0010ffff'
+DELETE_OBJECTS_MAX_KEYS = 1000
+_LIST_DONE = object()
+_umask_lock = threading.Lock()
+
+
+class _ListError:
+    # Carries an exception raised inside a listing worker to the consuming thread.
+    def __init__(self, error):
+        self.error = error
+
+
+def _file_mode(file_name: str) -> int:
+    # Mode a downloaded file gets: the one of the file it replaces, else what open() would create with the umask
+    try:
+        return stat.S_IMODE(os.stat(file_name).st_mode)
+    except FileNotFoundError:
+        with _umask_lock:
+            umask = os.umask(0)
+            os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _chunked(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 class BotoMinio:
@@ -17,27 +68,37 @@ class BotoMinio:
         self.version = settings.STORAGE_VERSION
         self.external_host = settings.S3_EXTERNAL_HOST_URL if settings.USE_S3_EXTERNAL_CLIENT else settings.S3_INTERNAL_HOST_URL
 
-        self.resource = boto3.resource(self.storage,
-                                       endpoint_url=self.hostname,
-                                       config=boto3.session.Config(
-                                           signature_version=self.version),
-                                       aws_access_key_id=self.access_key,
-                                       aws_secret_access_key=self.secret_key)
-
-        self.client = boto3.client(self.storage,
-                                   endpoint_url=self.hostname,
-                                   config=boto3.session.Config(
-                                       signature_version=self.version),
-                                   aws_access_key_id=self.access_key,
-                                   aws_secret_access_key=self.secret_key)
-
-        self.external_client = boto3.client(self.storage,
-                                            endpoint_url=self.external_host,
-                                            config=boto3.session.Config(
-                                                signature_version=self.version),
-                                            aws_access_key_id=self.access_key,
-                                            aws_secret_access_key=self.secret_key)
+    # Clients and resources are always fetched from the pool (built there on first use, and rebuilt in a forked
+    # child), so an instance created before a fork never shares the connections of the parent process.
+    @property
+    def resource(self):
+        return client_pool.get_resource(self.storage, self.hostname, self.access_key, self.secret_key, self.version)
 
+    @property
+    def client(self):
+        return client_pool.get_client(self.storage, self.hostname, self.access_key, self.secret_key, self.version)
+
+    @property
+    def external_client(self):
+        if self.external_host == self.hostname:
+            return self.client
+        return client_pool.get_client(self.storage, self.external_host, self.access_key, self.secret_key,
+                                      self.version)
+
+    def client_for(self, operation: str):
+        """
+        Returns the internal client to use for the given client method, honouring the deadline configured for it
+        in S3_OPERATION_TIMEOUTS (e.x : a short read_timeout for head_object, a long one for get_object).
+        @param operation: Client method name (e.x : 'head_object')
+        @return: boto3 client
+        """
+        timeouts = operation_timeouts(operation)
+        if timeouts is None:
+            return self.client
+        return client_pool.get_client(self.storage, self.hostname, self.access_key, self.secret_key, self.version,
+                                      timeouts=timeouts)
+
+    @instrumented
     def check_bucket_exist(self, bucket_name):
         """
         This function is used to check whether specified bucket exists or not.
@@ -45,69 +106,323 @@ class BotoMinio:
         @return: Success - Returns True
                  Failure - Returns False
         """
+        cached = existence_cache.get_bucket(self.hostname, bucket_name)
+        if cached is not None:
+            return cached
         try:
-            response = self.client.head_bucket(
+            response = self.client_for('head_bucket').head_bucket(
                 Bucket=bucket_name,
             )
-            return response['ResponseMetadata']['HTTPStatusCode'] == 200
+            exists = response['ResponseMetadata']['HTTPStatusCode'] == 200
+            existence_cache.set_bucket(self.hostname, bucket_name, exists)
+            return exists
         except ClientError as e:
             logger.exception(f"Client Error Occured During Checking Bucket Exists (check_bucket_exist) : {e}")
+            if e.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                existence_cache.set_bucket(self.hostname, bucket_name, False)
             return False
         except Exception as e:
             logger.exception(f"Unhandled Exception Occured During Checking Bucket Exists (check_bucket_exist) : {e}")
             return False
 
 
+    def iter_objects(self,
+                     bucket_name: str,
+                     prefix: str = None,
+                     suffixes=None,
+                     recursive: bool = True,
+                     start_after: str = None,
+                     max_results: int = None,
+                     page_size: int = 1000,
+                     end_key: str = None):
+        """
+        Lazily lists the objects of the S3 Bucket, one ListObjectsV2 page at a time.
+        ClientError (e.x : NoSuchBucket) is raised to the caller instead of silently truncating the listing.
+        @param bucket_name: S3 Bucket Name
+        @param prefix: Folder prefix, only the keys starting with it are listed
+        @param suffixes: File Extension or tuple of File Extensions/suffixes to be matched (e.x : ('.csv', '.txt'))
+        @param recursive: True - Lists inside all the folders(prefix) below the given prefix
+                          False - Lists only the objects directly under the prefix (Delimiter='/' on the server)
+        @param start_after: Key after which the listing starts (e.x : Last key of a previous listing to resume it)
+        @param max_results: Maximum number of matching objects to be returned
+        @param page_size: Number of keys requested per ListObjectsV2 call (max 1000)
+        @param end_key: Last key (inclusive) to be listed, the listing stops after it
+        @return: Generator of the object dicts returned by ListObjectsV2 (Key, Size, ETag, LastModified ...)
+        """
+        if isinstance(suffixes, list):
+            suffixes = tuple(suffixes)
+        params = {'Bucket': bucket_name}
+        if prefix:
+            params['Prefix'] = prefix
+        if not recursive:
+            params['Delimiter'] = '/'
+        if start_after:
+            params['StartAfter'] = start_after
+        paginator = self.client_for('list_objects_v2').get_paginator('list_objects_v2')
+        count = 0
+        for page in paginator.paginate(PaginationConfig={'PageSize': page_size}, **params):
+            for obj in page.get('Contents', ()):
+                if end_key is not None and obj['Key'] > end_key:
+                    return
+                if suffixes and not obj['Key'].endswith(suffixes):
+                    continue
+                yield obj
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+
+    def iter_objects_parallel(self,
+                              bucket_name: str,
+                              prefix: str = None,
+                              suffixes=None,
+                              shards=None,
+                              max_workers: int = None,
+                              ordered: bool = False,
+                              max_results: int = None,
+                              page_size: int = 1000):
+        """
+        Recursively lists the objects of the S3 Bucket, listing several key ranges (shards) at the same time.
+        By default, the shards are split on the folders(prefix) directly below the given prefix when the first
+        Delimiter='/' page finds enough of them, and otherwise on the leading characters of the keys (see
+        _sample_list_boundaries), so flat buckets are sharded too. Each shard is a serial ListObjectsV2 chain
+        streamed through a bounded queue, at most max_workers of them run at once.
+        @param bucket_name: S3 Bucket Name
+        @param prefix: Folder prefix, only the keys starting with it are listed
+        @param suffixes: File Extension or tuple of File Extensions/suffixes to be matched (e.x : ('.csv', '.txt'))
+        @param shards: Optional sorted list of boundary keys used instead of the discovered folders.
+                       e.x : shards=['g', 'n'] lists the ranges (..., 'g'], ('g', 'n'] and ('n', ...) concurrently
+        @param max_workers: Maximum number of concurrent ListObjectsV2 requests (Default S3_LIST_MAX_WORKERS)
+        @param ordered: True - Objects are returned in key order
+                        False - Objects are returned as soon as any shard lists them
+        @param max_results: Maximum number of matching objects to be returned
+        @param page_size: Number of keys requested per ListObjectsV2 call (max 1000)
+        @return: Generator of the object dicts returned by ListObjectsV2 (Key, Size, ETag, LastModified ...)
+        """
+        if isinstance(suffixes, list):
+            suffixes = tuple(suffixes)
+        max_workers = max_workers or getattr(settings, 'S3_LIST_MAX_WORKERS', DEFAULT_LIST_MAX_WORKERS)
+        if shards is None:
+            shards = self._discover_list_boundaries(bucket_name, prefix, page_size, max_workers)
+        bounds = [None] + list(shards) + [None]
+        segments = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+        stop = threading.Event()
+        shared_queue = None if ordered else queue.Queue(maxsize=page_size * 2)
+
+        def _put(target, item):
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _list_segment(segment, target):
+            start_after, end_key = segment
+            try:
+                for obj in self.iter_objects(bucket_name, prefix=prefix, suffixes=suffixes,
+                                             start_after=start_after, end_key=end_key, page_size=page_size):
+                    if not _put(target, obj):
+                        return
+                _put(target, _LIST_DONE)
+            except Exception as e:
+                _put(target, _ListError(e))
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='s3lib-list')
+        try:
+            sources = []
+            for segment in segments:
+                target = shared_queue if shared_queue is not None else queue.Queue(maxsize=page_size)
+                executor.submit(contextvars.copy_context().run, _list_segment, segment, target)
+                sources.append(target)
+
+            if ordered:
+                stream = self._drain_ordered(sources)
+            else:
+                stream = self._drain_unordered(sources, shared_queue)
+            count = 0
+            for obj in stream:
+                yield obj
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discover_list_boundaries(self, bucket_name: str, prefix: str, page_size: int, max_workers: int) -> list:
+        """
+        Listings of a single page are not sharded. Otherwise, the first Delimiter='/' page of the prefix is read,
+        its folders are used as shard boundaries when the page holds the whole top level and there are at least
+        max_workers of them, otherwise boundaries are sampled from the keys. Nothing is buffered but the folder
+        names of that single page.
+        @return: Sorted list of boundary keys
+        """
+        client = self.client_for('list_objects_v2')
+        params = {'Bucket': bucket_name, 'MaxKeys': page_size}
+        if prefix:
+            params['Prefix'] = prefix
+        if not client.list_objects_v2(**params).get('IsTruncated'):
+            return []
+        page = client.list_objects_v2(Delimiter='/', **params)
+        folders = sorted(common_prefix['Prefix'] for common_prefix in page.get('CommonPrefixes', ()))
+        if not page.get('IsTruncated'):
+            if not folders:
+                # At most one page of objects, a single shard lists it in one request
+                return []
+            if len(folders) >= max_workers:
+                return folders
+        return self._sample_list_boundaries(bucket_name, prefix or EMPTY_STRING, max_workers)
+
+    def _sample_list_boundaries(self, bucket_name: str, prefix: str, max_workers: int) -> list:
+        """
+        Finds the distinct leading characters of the keys below the prefix with MaxKeys=1 listings that skip
+        from one character to the next (one request per character found). While fewer than max_workers key
+        prefixes are found, they are expanded one character further, up to LIST_SAMPLE_MAX_DEPTH times
+        (e.x : 'img_0001.jpg', 'img_0002.jpg'... are split on 'img_0001', 'img_0002'...). A prefix with a single
+        child is replaced by the longest prefix shared by all its keys, found by a binary search of skips.
+        The prefixes found are used as shard boundaries. They only balance the shards: keys are listed whatever
+        their characters are, as the shards cover the whole key range.
+        @return: Sorted list of boundary keys
+        """
+        client = self.client_for('list_objects_v2')
+
+        def _first_key(parent, start_after=None):
+            params = {'Bucket': bucket_name, 'Prefix': parent, 'MaxKeys': 1}
+            if start_after:
+                params['StartAfter'] = start_after
+            contents = client.list_objects_v2(**params).get('Contents')
+            return contents[0]['Key'] if contents else None
+
+        def _children(parent):
+            children = []
+            first = None
+            start_after = None
+            while True:
+                key = _first_key(parent, start_after)
+                if key is None:
+                    break
+                if len(key) == len(parent):
+                    start_after = key
+                    continue
+                first = first or key
+                children.append(key[:len(parent) + 1])
+                start_after = children[-1] + _MAX_KEY_CHAR
+            if len(children) != 1:
+                return children
+            # Every key below parent starts with children[0], the longest prefix they share is at most first
+            shared, unknown = len(children[0]), len(first)
+            while shared < unknown:
+                length = (shared + unknown + 1) // 2
+                if _first_key(parent, first[:length] + _MAX_KEY_CHAR) is None:
+                    shared = length
+                else:
+                    unknown = length - 1
+            return [first[:shared]]
+
+        # Key prefixes splitting the key range, a prefix is replaced by its children when it is expanded
+        frontier = [prefix]
+        leaves = set()
+        for _ in range(LIST_SAMPLE_MAX_DEPTH):
+            expanded = []
+            for parent, children, error in bounded_map(_children, [key for key in frontier if key not in leaves],
+                                                       max_workers, thread_name_prefix='s3lib-list-sample'):
+                if error is not None:
+                    raise error
+                if children:
+                    expanded.extend(children)
+                else:
+                    leaves.add(parent)
+            if not expanded:
+                break
+            frontier = sorted(expanded + [key for key in frontier if key in leaves])
+            if len(frontier) >= max_workers:
+                break
+        # The first prefix starts the first shard already
+        return frontier[1:]
+
+    @staticmethod
+    def _drain_ordered(sources):
+        for source in sources:
+            while True:
+                item = source.get()
+                if item is _LIST_DONE:
+                    break
+                if isinstance(item, _ListError):
+                    raise item.error
+                yield item
+
+    @staticmethod
+    def _drain_unordered(sources, shared_queue):
+        pending = len(sources)
+        while pending:
+            item = shared_queue.get()
+            if item is _LIST_DONE:
+                pending -= 1
+                continue
+            if isinstance(item, _ListError):
+                raise item.error
+            yield item
+
+    @instrumented
     def list_files_by_extension(self, bucket_name, file_extension, prefix=None, include_all_prefix=False):
         """
         Lists all the objects from S3 Bucket by given file_extension.
         @param include_all_prefix: True - Checks inside the all the folders(prefix) present in that particular bucket
+                                   (listed with iter_objects_parallel when S3_LIST_MAX_WORKERS > 1)
         @param file_extension: File Extensions to be searched
         @param prefix: Folder prefix
         @param bucket_name: Bucket Name
         @return: True if success else False
         """
-        if self.check_bucket_exist(bucket_name) and prefix is not None and include_all_prefix is False:
-            logger.debug(f"Searching files inside the Bucket : {bucket_name} with prefix : {prefix}")
-            bucket = self.resource.Bucket(bucket_name)
-            objects = bucket.objects.filter(Prefix=prefix)
-            search_result = [{'Key': o.key} for o in objects if o.key.endswith(file_extension)]
-            logger.debug(f"Search Result : {search_result}")
+        bucket_exists = self.check_bucket_exist(bucket_name)
+        if bucket_exists and prefix is not None and include_all_prefix is False:
+            logger.debug("Searching files inside the Bucket : %s with prefix : %s", bucket_name, prefix)
+            objects = self.iter_objects(bucket_name, prefix=prefix, suffixes=file_extension)
+            search_result = [{'Key': o['Key']} for o in objects]
+            logger.debug("Search Result : %s", search_result)
             if search_result:
                 return search_result
             else:
-                logger.info(
-                    f"No files found in path : {prefix} with extension : {file_extension} from Bucket : {bucket_name}")
+                logger.info("No files found in path : %s with extension : %s from Bucket : %s",
+                            prefix, file_extension, bucket_name)
                 return []
-        elif self.check_bucket_exist(bucket_name) and prefix is None and include_all_prefix is False:
+        elif bucket_exists and prefix is None and include_all_prefix is False:
             logger.debug(
-                f"Searching files inside the Bucket : {bucket_name}, Excluding all prefix inside bucket while searching")
-            bucket = self.resource.Bucket(bucket_name)
-            objects = bucket.objects.all()
-            search_result = [{'Key': o.key} for o in objects if o.key.endswith(file_extension) and '/' not in o.key]
-            logger.debug(f"Search Result : {search_result}")
+                "Searching files inside the Bucket : %s, Excluding all prefix inside bucket while searching",
+                bucket_name)
+            objects = self.iter_objects(bucket_name, suffixes=file_extension, recursive=False)
+            search_result = [{'Key': o['Key']} for o in objects]
+            logger.debug("Search Result : %s", search_result)
             if search_result:
                 return search_result
             else:
-                logger.info(
-                    f"No files found in Bucket : {bucket_name}, with extension : {file_extension}, (Excluded Prefixes)")
+                logger.info("No files found in Bucket : %s, with extension : %s, (Excluded Prefixes)",
+                            bucket_name, file_extension)
                 return []
-        elif self.check_bucket_exist(bucket_name) and prefix is None and include_all_prefix is True:
+        elif bucket_exists and prefix is None and include_all_prefix is True:
             logger.debug(
-                f"Searching files inside the Bucket : {bucket_name}, Including all prefix inside bucket while searching")
-            bucket = self.resource.Bucket(bucket_name)
-            objects = bucket.objects.all()
-            search_result = [{'Key': o.key} for o in objects if o.key.endswith(file_extension)]
-            logger.debug(f"Search Result : {search_result}")
+                "Searching files inside the Bucket : %s, Including all prefix inside bucket while searching",
+                bucket_name)
+            max_workers = getattr(settings, 'S3_LIST_MAX_WORKERS', DEFAULT_LIST_MAX_WORKERS)
+            if max_workers > 1:
+                objects = self.iter_objects_parallel(bucket_name, suffixes=file_extension, max_workers=max_workers,
+                                                     ordered=True)
+            else:
+                objects = self.iter_objects(bucket_name, suffixes=file_extension)
+            search_result = [{'Key': o['Key']} for o in objects]
+            logger.debug("Search Result : %s", search_result)
             if search_result:
                 return search_result
             else:
-                logger.info(
-                    f"No files found in Bucket : {bucket_name}, with extension : {file_extension}, (Including all Prefixes)")
+                logger.info("No files found in Bucket : %s, with extension : %s, (Including all Prefixes)",
+                            bucket_name, file_extension)
                 return []
         else:
-            logger.info(f"Bucket Does not Exists or Invalid Parameters Passed")
+            logger.info("Bucket Does not Exists or Invalid Parameters Passed")
             return []
+
     def check_local_file_exist(self, file_name: str) -> bool:
         """
         Helper method to verify if the specified local file exists in the local directory
@@ -119,6 +434,7 @@ class BotoMinio:
             return True
         return False
 
+    @instrumented
     def check_object_exist(self, bucket_name: str, object_path: str) -> bool:
         """
         Helper method to verify if the specified  file exists in the specified bucket or not.
@@ -128,37 +444,46 @@ class BotoMinio:
         @return: Success - Returns True
                  Failure - Returns False
         """
+        cached = existence_cache.get_object(self.hostname, bucket_name, object_path)
+        if cached is not None:
+            return cached
         try:
-            response = self.client.head_object(
+            response = self.client_for('head_object').head_object(
                 Bucket=bucket_name,
                 Key=object_path
             )
-            return response['ResponseMetadata']['HTTPStatusCode'] == 200
+            exists = response['ResponseMetadata']['HTTPStatusCode'] == 200
+            existence_cache.set_object(self.hostname, bucket_name, object_path, exists)
+            return exists
         except ClientError as e:
             logger.exception(f"Client Error Occured During Checking Bucket Exists (check_object_exist) : {e}")
+            if e.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                existence_cache.set_object(self.hostname, bucket_name, object_path, False)
             return False
         except Exception as e:
             logger.exception(f"Unhandled Exception Occured During Checking Bucket Exists (check_object_exist) : {e}")
             return False
-    def generate_pre_signed_link(self, bucket_name: str, object_path: str, expires_in: int) -> str:
+    @instrumented
+    def generate_pre_signed_link(self,
+                                 bucket_name: str,
+                                 object_path: str,
+                                 expires_in: int,
+                                 check_exist: bool = True) -> str:
         """
         Generates the pre-signed link for the specified object in the S3 Bucket
         @param bucket_name: S3 Bucket Name
         @param object_path: This is the path in S3 (inside Specified Bucket) where file needs to be stored.
                             e.x : object_path='temp/a.txt'  or object_path='a.txt'
         @param expires_in: Expiry Time in seconds
+        @param check_exist: True - Verifies that the bucket and object exist before signing
+                            False - Signs the link locally without any network call
         @return: Success - Returns Pre-Signed link of the object
                  Failure - Returns Empty String
         """
         try:
-            if self.check_bucket_exist(bucket_name) and self.check_object_exist(bucket_name, object_path):
-                response = self.external_client.generate_presigned_url('get_object',
-                                                                       Params={
-                                                                           'Bucket': bucket_name,
-                                                                           'Key': object_path
-                                                                       },
-                                                                       ExpiresIn=expires_in)
-                return response
+            if not check_exist or (self.check_bucket_exist(bucket_name) and
+                                   self.check_object_exist(bucket_name, object_path)):
+                return self._sign_get_object(bucket_name, object_path, expires_in)
             else:
                 logger.debug("Failed to Generate Pre-signed link for the specified File")
                 return EMPTY_STRING
@@ -169,6 +494,53 @@ class BotoMinio:
             logger.exception(f"Unhandled Exception Occured During Generating Pre-signed Link : {e}")
             return EMPTY_STRING
 
+    @instrumented
+    def generate_pre_signed_links(self,
+                                  bucket_name: str,
+                                  object_paths,
+                                  expires_in: int,
+                                  check_exist: bool = False) -> dict:
+        """
+        Generates the pre-signed links for many objects of the same bucket. Signing is done locally.
+        @param bucket_name: S3 Bucket Name
+        @param object_paths: Iterable of paths in S3 (inside Specified Bucket)
+                             e.x : object_paths=['temp/a.txt', 'b.txt']
+        @param expires_in: Expiry Time in seconds
+        @param check_exist: True - Verifies that the bucket exists (once) and each object exists before signing
+                            False - Signs the links without any network call
+        @return: Dict of object_path to Pre-Signed link, Empty String for the objects that failed
+        """
+        links = {}
+        if check_exist and not self.check_bucket_exist(bucket_name):
+            logger.debug("Failed to Generate Pre-signed links, Specified Bucket Doesn't Exists")
+            return {object_path: EMPTY_STRING for object_path in object_paths}
+        for object_path in object_paths:
+            try:
+                if check_exist and not self.check_object_exist(bucket_name, object_path):
+                    links[object_path] = EMPTY_STRING
+                else:
+                    links[object_path] = self._sign_get_object(bucket_name, object_path, expires_in)
+            except Exception as e:
+                logger.exception(f"Unhandled Exception Occured During Generating Pre-signed Links : {e}")
+                links[object_path] = EMPTY_STRING
+        return links
+
+    def _sign_get_object(self, bucket_name: str, object_path: str, expires_in: int) -> str:
+        """
+        Signs a get_object link with the external client, reusing a cached link when enabled.
+        """
+        url = presigned_url_cache.get(self.external_host, bucket_name, object_path, expires_in)
+        if url is None:
+            url = self.external_client.generate_presigned_url('get_object',
+                                                              Params={
+                                                                  'Bucket': bucket_name,
+                                                                  'Key': object_path
+                                                              },
+                                                              ExpiresIn=expires_in)
+            presigned_url_cache.set(self.external_host, bucket_name, object_path, expires_in, url)
+        return url
+
+    @instrumented
     def put_object(self, bucket_name: str, data: bytes, object_path: str, content_type='octet/stream') -> bool:
         """
         This function Adds an object to a bucket.
@@ -182,19 +554,33 @@ class BotoMinio:
                  Failure - False
         """
         try:
-            obj = self.resource.Object(bucket_name, object_path)
-            response = obj.put(Body=data, ContentType=content_type)
-            return response['ResponseMetadata']['HTTPStatusCode'] == 200
+            response = self.client_for('put_object').put_object(Bucket=bucket_name, Key=object_path, Body=data,
+                                                                ContentType=content_type)
+            success = response['ResponseMetadata']['HTTPStatusCode'] == 200
+            if success:
+                existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+                if isinstance(data, (bytes, bytearray)):
+                    object_cache.set(self.hostname, bucket_name, object_path, response.get('ETag'), data)
+                else:
+                    object_cache.invalidate(self.hostname, bucket_name, object_path)
+            else:
+                existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+                object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return success
         except ClientError as error:
             logger.exception(f"Client Error Occured During PUT Object (put_object): {error}")
+            existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             if error.response['ResponseMetadata']['HTTPStatusCode'] == 404:
                 return False
             else:
                 return False
         except Exception as e:
             logger.exception(f"Unhandled Exception Occured During PUT Object (put_object): {e}")
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             return False
 
+    @instrumented
     def put_object_and_get_link(self,
                                 bucket_name: str,
                                 data: bytes,
@@ -215,23 +601,24 @@ class BotoMinio:
             if self.put_object(bucket_name=bucket_name, data=data, object_path=object_path, content_type=content_type):
                 return self.hostname + bucket_name + '/' + object_path
             else:
-                logger.debug(f"Specified Bucket Doesn't Exists Hence Failure in put object (put_object_and_get_link)")
+                logger.debug("Specified Bucket Doesn't Exists Hence Failure in put object (put_object_and_get_link)")
                 return EMPTY_STRING
         else:
             logger.exception(f"Specified Bucket Doesn't Exists Hence Failure in put object (put_object_and_get_link)")
             return EMPTY_STRING
 
+    @instrumented
     def put_object_and_get_pre_signed_link(self,
                                            bucket_name: str,
                                            data: bytes,
                                            object_path: str,
-                                           expires_in=settings.DEFAULT_S3_LINK_EXPIRY_TIMEOUT,
+                                           expires_in: int = None,
                                            content_type='octet/stream') -> str:
         """
         This function Adds an object to a bucket and returns pre-signed link.
         You must have WRITE permissions on a bucket to add an object to it.
         @param content_type: MIME Type of the file
-        @param expires_in: Expiry Time in seconds
+        @param expires_in: Expiry Time in seconds (Default settings.DEFAULT_S3_LINK_EXPIRY_TIMEOUT)
         @param bucket_name: S3 Bucket name
         @param data: bytes or file
         @param object_path: This is the path in S3 (inside Specified Bucket) where file needs to be stored.
@@ -239,6 +626,8 @@ class BotoMinio:
         @return:  Success - Returns Pre-signed Link og the Object
                   Failure - Returns Empty String
         """
+        if expires_in is None:
+            expires_in = settings.DEFAULT_S3_LINK_EXPIRY_TIMEOUT
         if self.check_bucket_exist(bucket_name):
             if self.put_object(bucket_name=bucket_name, data=data, object_path=object_path, content_type=content_type):
                 return self.generate_pre_signed_link(bucket_name=bucket_name,
@@ -252,15 +641,18 @@ class BotoMinio:
                 f"Specified Bucket Doesn't Exists Hence Failure in put object (put_object_and_get_pre_signed_link)")
             return EMPTY_STRING
 
+    @instrumented
     def upload_file(self,
                     bucket_name: str,
                     file_name,
                     object_path: str,
-                    content_type='octet/stream') -> bool:
+                    content_type='octet/stream',
+                    transfer_config=None) -> bool:
         """
         This function is used to upload file to specified bucket .
         You must have WRITE permissions on a bucket to add an object to it.
         @param content_type: MIME Type of the file.(By default it's considered as octet/stream)
+        @param transfer_config: TransferConfig or dict overriding the multipart settings (see get_transfer_config)
         @param bucket_name: S3 Bucket Name
         @param file_name: File to be uploaded to S3 Bucket ( File Must be present locally, and it can take file_name/
                           file_path)
@@ -270,23 +662,31 @@ class BotoMinio:
                  Failure - Returns False
         """
         logger.debug(
-            f"Uploading File: {file_name} to Bucket: {bucket_name} with path: {object_path} , MIME: {content_type} ")
+            "Uploading File: %s to Bucket: %s with path: %s , MIME: %s ",
+            file_name, bucket_name, object_path, content_type)
         if self.check_bucket_exist(bucket_name) and self.check_local_file_exist(file_name):
-            self.client.upload_file(file_name, bucket_name, object_path, ExtraArgs={'ContentType': content_type})
+            self.client_for('upload_file').upload_file(file_name, bucket_name, object_path,
+                                                       ExtraArgs={'ContentType': content_type},
+                                                       Config=get_transfer_config(transfer_config))
+            existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             return True
         else:
             logger.exception(f"Failed to Upload file to the Specified Bucket (upload_file)")
             return False
 
+    @instrumented
     def upload_file_and_get_link(self,
                                  bucket_name: str,
                                  file_name: str,
                                  object_path: str,
-                                 content_type='octet/stream') -> str:
+                                 content_type='octet/stream',
+                                 transfer_config=None) -> str:
         """
         This function is used to upload file to specified bucket .
         You must have WRITE permissions on a bucket to add an object to it.
         @param content_type: MIME Type of the file.(By default it's considered as octet/stream)
+        @param transfer_config: TransferConfig or dict overriding the multipart settings (see get_transfer_config)
         @param bucket_name: S3 Bucket Name
         @param file_name: File to be uploaded to S3 Bucket ( File Must be present locally, and it can take file_name/
                           file_path)
@@ -296,20 +696,27 @@ class BotoMinio:
                  Failure - Returns Empty String
         """
         logger.debug(
-            f"Uploading File: {file_name} to Bucket: {bucket_name} with path: {object_path} , MIME: {content_type} ")
+            "Uploading File: %s to Bucket: %s with path: %s , MIME: %s ",
+            file_name, bucket_name, object_path, content_type)
         if self.check_bucket_exist(bucket_name) and self.check_local_file_exist(file_name):
-            self.client.upload_file(file_name, bucket_name, object_path, ExtraArgs={'ContentType': content_type})
+            self.client_for('upload_file').upload_file(file_name, bucket_name, object_path,
+                                                       ExtraArgs={'ContentType': content_type},
+                                                       Config=get_transfer_config(transfer_config))
+            existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             return self.hostname + bucket_name + '/' + object_path
         else:
             logger.exception(f"Failed to Upload file to the Specified Bucket (upload_file_and_get_link)")
             return EMPTY_STRING
 
+    @instrumented
     def upload_file_and_get_pre_signed_link(self,
                                             bucket_name: str,
                                             file_name: str,
                                             object_path: str,
-                                            expires_in=settings.DEFAULT_S3_LINK_EXPIRY_TIMEOUT,
+                                            expires_in: int = None,
                                             content_type='octet/stream',
+                                            transfer_config=None,
                                             ) -> str:
         """
         This function is used to upload file to specified bucket and get pre-signed link.
@@ -320,14 +727,22 @@ class BotoMinio:
         @param object_path: This is the path in S3 (inside Specified Bucket) where file needs to be stored.
                             e.x : object_path='temp/a.txt'  or object_path='a.txt'
         @param content_type: MIME Type of the file.(By default it's considered as octet/stream)
-        @param expires_in: Expiry Time in seconds
+        @param expires_in: Expiry Time in seconds (Default settings.DEFAULT_S3_LINK_EXPIRY_TIMEOUT)
+        @param transfer_config: TransferConfig or dict overriding the multipart settings (see get_transfer_config)
         @return:  Success - Returns Pre-signed Link
                   Failure - Returns Empty String
         """
+        if expires_in is None:
+            expires_in = settings.DEFAULT_S3_LINK_EXPIRY_TIMEOUT
         logger.debug(
-            f"Uploading File: {file_name} to Bucket: {bucket_name} with path: {object_path} , MIME: {content_type} ")
+            "Uploading File: %s to Bucket: %s with path: %s , MIME: %s ",
+            file_name, bucket_name, object_path, content_type)
         if self.check_bucket_exist(bucket_name) and self.check_local_file_exist(file_name):
-            self.client.upload_file(file_name, bucket_name, object_path, ExtraArgs={'ContentType': content_type})
+            self.client_for('upload_file').upload_file(file_name, bucket_name, object_path,
+                                                       ExtraArgs={'ContentType': content_type},
+                                                       Config=get_transfer_config(transfer_config))
+            existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             return self.generate_pre_signed_link(bucket_name=bucket_name,
                                                  object_path=object_path,
                                                  expires_in=expires_in)
@@ -335,6 +750,287 @@ class BotoMinio:
             logger.exception(f"Failed to Upload file to the Specified Bucket (upload_file_and_get_pre_signed_link)")
             return EMPTY_STRING
 
+    @instrumented
+    def upload_fileobj(self,
+                       bucket_name: str,
+                       fileobj,
+                       object_path: str,
+                       content_type='octet/stream',
+                       transfer_config=None) -> bool:
+        """
+        This function is used to upload a file-like object (or an iterable of bytes chunks) to specified bucket.
+        Data is sent as multipart parts while it is read, so peak memory stays at a few multipart_chunksize,
+        whatever the size of the object.
+        You must have WRITE permissions on a bucket to add an object to it.
+        @param bucket_name: S3 Bucket Name
+        @param fileobj: Binary file-like object opened for reading, or iterable of bytes chunks (e.x : a generator)
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file needs to be stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @param content_type: MIME Type of the file.(By default it's considered as octet/stream)
+        @param transfer_config: TransferConfig or dict overriding the multipart settings (see get_transfer_config)
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        logger.debug("Uploading stream to Bucket: %s with path: %s , MIME: %s", bucket_name, object_path, content_type)
+        if not self.check_bucket_exist(bucket_name):
+            logger.error("Failed to Upload stream to the Specified Bucket (upload_fileobj)")
+            return False
+        if not hasattr(fileobj, 'read'):
+            fileobj = IterableStream(fileobj)
+        try:
+            self.client_for('upload_fileobj').upload_fileobj(fileobj, bucket_name, object_path,
+                                                             ExtraArgs={'ContentType': content_type},
+                                                             Config=get_transfer_config(transfer_config))
+            existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return True
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Upload of stream (upload_fileobj) : {e}")
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Upload of stream (upload_fileobj) : {e}")
+        existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+        object_cache.invalidate(self.hostname, bucket_name, object_path)
+        return False
+
+    @instrumented
+    def upload_many(self,
+                    bucket_name: str,
+                    items,
+                    max_workers: int = None,
+                    expires_in: int = None) -> list:
+        """
+        This function is used to upload many local files to specified bucket concurrently.
+        The bucket is checked once, and at most 2 * max_workers files are in flight at any time.
+        @param bucket_name: S3 Bucket Name
+        @param items: Iterable of (file_name, object_path) or (file_name, object_path, content_type) tuples
+                      e.x : items=[('/tmp/a.txt', 'temp/a.txt', 'text/plain'), ('/tmp/b.bin', 'b.bin')]
+        @param max_workers: Number of concurrent uploads (Default S3_BULK_MAX_WORKERS)
+        @param expires_in: If given, a Pre-signed Link valid for expires_in seconds is generated for every
+                           uploaded object
+        @return: List of {'Key': object_path, 'Success': bool, 'Error': str, 'Link': str} in completion order
+        """
+        return self._transfer_many(bucket_name, items, self._upload_item, max_workers, expires_in, 'upload_many')
+
+    @instrumented
+    def put_many(self,
+                 bucket_name: str,
+                 items,
+                 max_workers: int = None,
+                 expires_in: int = None) -> list:
+        """
+        This function Adds many in memory objects to a bucket concurrently.
+        The bucket is checked once, and at most 2 * max_workers objects are in flight at any time.
+        @param bucket_name: S3 Bucket Name
+        @param items: Iterable of (data, object_path) or (data, object_path, content_type) tuples
+                      e.x : items=[(b'hello', 'temp/a.txt', 'text/plain')]
+        @param max_workers: Number of concurrent uploads (Default S3_BULK_MAX_WORKERS)
+        @param expires_in: If given, a Pre-signed Link valid for expires_in seconds is generated for every
+                           uploaded object
+        @return: List of {'Key': object_path, 'Success': bool, 'Error': str, 'Link': str} in completion order
+        """
+        return self._transfer_many(bucket_name, items, self._put_item, max_workers, expires_in, 'put_many')
+
+    def _upload_item(self, bucket_name: str, file_name, object_path: str, content_type: str):
+        if not self.check_local_file_exist(file_name):
+            raise FileNotFoundError(f"Local file does not exist : {file_name}")
+        self.client_for('upload_file').upload_file(file_name, bucket_name, object_path,
+                                                   ExtraArgs={'ContentType': content_type},
+                                                   Config=get_transfer_config())
+
+    def _put_item(self, bucket_name: str, data, object_path: str, content_type: str):
+        self.client_for('put_object').put_object(Bucket=bucket_name, Key=object_path, Body=data,
+                                                 ContentType=content_type)
+
+    def _transfer_many(self, bucket_name: str, items, transfer, max_workers: int, expires_in: int,
+                       method_name: str) -> list:
+        if not self.check_bucket_exist(bucket_name):
+            logger.error("Specified Bucket Doesn't Exists Hence Failure in bulk upload (%s)", method_name)
+            return [{'Key': item[1], 'Success': False, 'Error': 'Bucket does not exist', 'Link': EMPTY_STRING}
+                    for item in items]
+
+        def _run(item):
+            source, object_path = item[0], item[1]
+            content_type = item[2] if len(item) > 2 and item[2] else 'octet/stream'
+            transfer(bucket_name, source, object_path, content_type)
+
+        max_workers = max_workers or getattr(settings, 'S3_BULK_MAX_WORKERS', DEFAULT_BULK_MAX_WORKERS)
+        results = []
+        for item, _, error in bounded_map(_run, items, max_workers, thread_name_prefix='s3lib-upload'):
+            object_path = item[1]
+            if error is not None:
+                logger.exception(f"Exception Occured During Upload of {object_path} ({method_name}) : {error}",
+                                 exc_info=error)
+                existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+                object_cache.invalidate(self.hostname, bucket_name, object_path)
+                results.append({'Key': object_path, 'Success': False, 'Error': str(error), 'Link': EMPTY_STRING})
+                continue
+            existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            link = EMPTY_STRING
+            if expires_in is not None:
+                link = self.generate_pre_signed_link(bucket_name, object_path, expires_in, check_exist=False)
+            results.append({'Key': object_path, 'Success': True, 'Error': EMPTY_STRING, 'Link': link})
+        return results
+
+    @instrumented
+    def get_object_bytes(self, bucket_name: str, object_path: str, transfer_config=None):
+        """
+        This function is used to read an object of the specified bucket into memory.
+        Objects larger than multipart_chunksize are fetched as byte ranges in parallel, straight into a single
+        preallocated buffer. Small objects are served from the object cache when it is enabled (see ObjectCache),
+        a cached copy only costs a conditional GET answered with 304 Not Modified.
+        @param bucket_name: S3 Bucket Name
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file is stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @param transfer_config: TransferConfig or dict overriding the chunk size/concurrency (see get_transfer_config)
+        @return: Success - Returns the content of the object as bytearray
+                 Failure - Returns None
+        """
+        try:
+            read_sequence = object_cache.start_read()
+            cached = object_cache.get(self.hostname, bucket_name, object_path)
+            if cached is not None and object_cache.is_fresh(cached):
+                return bytearray(cached.data)
+            holder = {}
+
+            def _allocate(size):
+                holder['buffer'] = bytearray(size)
+                return memoryview(holder['buffer'])
+
+            try:
+                etag = self._download_into(bucket_name, object_path, _allocate, get_transfer_config(transfer_config),
+                                           if_none_match=cached.etag if cached is not None else None)
+            except ClientError as e:
+                if cached is None or e.response['ResponseMetadata']['HTTPStatusCode'] != 304:
+                    raise
+                object_cache.mark_validated(cached)
+                return bytearray(cached.data)
+            object_cache.set(self.hostname, bucket_name, object_path, etag, holder['buffer'], read_sequence)
+            return holder['buffer']
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During GET Object (get_object_bytes) : {e}")
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
+            return None
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During GET Object (get_object_bytes) : {e}")
+            return None
+
+    @instrumented
+    def download_file(self, bucket_name: str, object_path: str, file_name: str, transfer_config=None) -> bool:
+        """
+        This function is used to download an object of the specified bucket to a local file.
+        The object is written to a preallocated, memory mapped temporary file in the same directory (byte ranges
+        are fetched in parallel directly into it), which replaces file_name once the download succeeded. The file
+        keeps the permissions of the one it replaces, a new file gets the default ones (umask applied).
+        @param bucket_name: S3 Bucket Name
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file is stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @param file_name: Local file name/path to be written, an existing file is left untouched if the download fails
+        @param transfer_config: TransferConfig or dict overriding the chunk size/concurrency (see get_transfer_config)
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        logger.debug("Downloading File from Bucket: %s with path: %s to: %s", bucket_name, object_path, file_name)
+        temp_name = None
+        try:
+            descriptor, temp_name = tempfile.mkstemp(dir=os.path.dirname(file_name) or None,
+                                                     prefix=f".{os.path.basename(file_name)}.", suffix='.tmp')
+            with os.fdopen(descriptor, 'wb+') as file:
+                holder = {}
+
+                def _allocate(size):
+                    file.truncate(size)
+                    if not size:
+                        return memoryview(bytearray())
+                    holder['map'] = mmap.mmap(file.fileno(), size)
+                    return memoryview(holder['map'])
+
+                try:
+                    self._download_into(bucket_name, object_path, _allocate, get_transfer_config(transfer_config))
+                finally:
+                    if 'map' in holder:
+                        try:
+                            holder['map'].close()
+                        except BufferError:
+                            # The traceback of a failed download still references views of the map, it is unmapped
+                            # once they are collected and the original exception is the one reported
+                            pass
+            # mkstemp creates owner only files
+            os.chmod(temp_name, _file_mode(file_name))
+            os.replace(temp_name, file_name)
+            return True
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Download File (download_file) : {e}")
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Download File (download_file) : {e}")
+        if temp_name and self.check_local_file_exist(temp_name):
+            os.remove(temp_name)
+        return False
+
+    def _download_into(self, bucket_name: str, object_path: str, allocate, config, if_none_match: str = None):
+        """
+        Fetches the object with a first ranged GET (which also returns its size and ETag), then the remaining
+        ranges in parallel, into the memoryview returned by allocate(size). Raises on any failure, including the
+        304 Not Modified answer when the object still has the if_none_match ETag.
+        @return: ETag of the object, None for an empty object
+        """
+        chunk_size = config.multipart_chunksize
+        conditions = {'IfNoneMatch': if_none_match} if if_none_match else {}
+        try:
+            response = self.client_for('get_object').get_object(Bucket=bucket_name, Key=object_path,
+                                                                Range=f"bytes=0-{chunk_size - 1}", **conditions)
+            size = int(response['ContentRange'].rsplit('/', 1)[-1]) if response.get('ContentRange') else \
+                response['ContentLength']
+        except ClientError as e:
+            if e.response['Error'].get('Code') != 'InvalidRange':
+                raise
+            # Empty objects can not be requested by range
+            allocate(0)
+            return None
+        etag = response.get('ETag')
+        view = allocate(size)
+        try:
+            readinto_fully(response['Body'], view[:min(chunk_size, size)])
+            starts = range(chunk_size, size, chunk_size)
+
+            client = self.client_for('get_object')
+
+            def _fetch(start):
+                with view[start:min(start + chunk_size, size)] as part:
+                    get_range_into(client, bucket_name, object_path, start, part, etag)
+
+            with closing(bounded_map(_fetch, starts, config.max_request_concurrency,
+                                     thread_name_prefix='s3lib-download')) as results:
+                # Closing waits for the running fetches, so none of them writes into the view once released
+                for _, _, error in results:
+                    if error is not None:
+                        raise error
+        finally:
+            view.release()
+        return etag
+
+    @instrumented
+    def open_object(self, bucket_name: str, object_path: str, read_ahead: int = DEFAULT_READ_AHEAD):
+        """
+        Opens an object of the specified bucket as a seekable, read only file-like object.
+        Only the byte ranges actually read are downloaded (e.x : header or footer of a large file).
+        @param bucket_name: S3 Bucket Name
+        @param object_path: This is the path in S3 (inside Specified Bucket) where file is stored.
+                            e.x : object_path='temp/a.txt'  or object_path='a.txt'
+        @param read_ahead: Minimum number of bytes fetched per Range GET, small reads are buffered
+        @return: Success - Returns S3ObjectReader
+                 Failure - Returns None
+        """
+        try:
+            return S3ObjectReader(self.client_for('get_object'), bucket_name, object_path, read_ahead=read_ahead)
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Opening Object (open_object) : {e}")
+            return None
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Opening Object (open_object) : {e}")
+            return None
+
+    @instrumented
     def delete_object(self, bucket_name: str, object_path: str) -> bool:
         """
         This function is used to delete object from the specified bucket.
@@ -345,17 +1041,349 @@ class BotoMinio:
                  Failure - Returns False
         """
         try:
-            logger.warning(f"Deleting a File from Bucket: {bucket_name} with path: {object_path}")
+            logger.warning("Deleting a File from Bucket: %s with path: %s", bucket_name, object_path)
             if self.check_bucket_exist(bucket_name) and self.check_object_exist(bucket_name, object_path):
-                response = self.client.delete_object(Bucket=bucket_name, Key=object_path)
-                return response['ResponseMetadata']['HTTPStatusCode'] == 204
+                response = self.client_for('delete_object').delete_object(Bucket=bucket_name, Key=object_path)
+                success = response['ResponseMetadata']['HTTPStatusCode'] == 204
+                if success:
+                    existence_cache.set_object(self.hostname, bucket_name, object_path, False)
+                    object_cache.invalidate(self.hostname, bucket_name, object_path)
+                else:
+                    existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+                    object_cache.invalidate(self.hostname, bucket_name, object_path)
+                return success
             else:
-                logger.debug(f"While Deleting File : Bucket/ File Doesn't Exists")
+                logger.debug("While Deleting File : Bucket/ File Doesn't Exists")
                 return False
         except ClientError as e:
             logger.exception(f"Client Error Occured During Deleting File (delete_object) : {e}")
+            existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             return False
         except Exception as e:
             logger.exception(f"Unhandled Exception Occured During Deleting File (delete_object) : {e}")
+            object_cache.invalidate(self.hostname, bucket_name, object_path)
             return False
 
+    @instrumented
+    def delete_objects(self, bucket_name: str, object_paths, max_workers: int = None, summary: bool = False) -> dict:
+        """
+        This function is used to delete many objects from the specified bucket with DeleteObjects requests
+        of up to 1000 keys each, run concurrently.
+        @param bucket_name: S3 Bucket Name
+        @param object_paths: Iterable of paths in S3 (inside Specified Bucket), consumed lazily
+                             e.x : object_paths=['temp/a.txt', 'b.txt'], a single str or bytes path is rejected
+        @param max_workers: Number of concurrent DeleteObjects requests (Default S3_BULK_MAX_WORKERS)
+        @param summary: Count the deleted objects instead of listing them, for very large deletions
+        @return: {'Deleted': [object_path, ...], 'Errors': [{'Key': object_path, 'Code': ..., 'Message': ...}, ...]}
+                 'Deleted' is the number of deleted objects when summary is set
+        """
+        if isinstance(object_paths, (str, bytes)):
+            raise TypeError("object_paths must be an iterable of paths, not a single path")
+        result = {'Deleted': 0 if summary else [], 'Errors': []}
+        if not self.check_bucket_exist(bucket_name):
+            logger.debug("While Deleting Files : Bucket Doesn't Exists")
+            for object_path in object_paths:
+                result['Errors'].append({'Key': object_path, 'Code': 'NoSuchBucket',
+                                         'Message': 'The specified bucket does not exist'})
+            return result
+
+        max_workers = max_workers or getattr(settings, 'S3_BULK_MAX_WORKERS', DEFAULT_BULK_MAX_WORKERS)
+        chunks = _chunked(object_paths, DELETE_OBJECTS_MAX_KEYS)
+        for chunk, response, error in bounded_map(lambda keys: self._delete_chunk(bucket_name, keys),
+                                                  chunks, max_workers, thread_name_prefix='s3lib-delete'):
+            if error is not None:
+                logger.exception(f"Exception Occured During Deleting Files (delete_objects) : {error}",
+                                 exc_info=error)
+                code = error.response['Error'].get('Code', '') if isinstance(error, ClientError) else 'Exception'
+                result['Errors'].extend({'Key': key, 'Code': code, 'Message': str(error)} for key in chunk)
+                for key in chunk:
+                    existence_cache.invalidate_object(self.hostname, bucket_name, key)
+                    object_cache.invalidate(self.hostname, bucket_name, key)
+                continue
+            errors = response.get('Errors', [])
+            failed = set()
+            for error_entry in errors:
+                failed.add(error_entry['Key'])
+                result['Errors'].append({'Key': error_entry['Key'], 'Code': error_entry.get('Code', ''),
+                                         'Message': error_entry.get('Message', '')})
+                existence_cache.invalidate_object(self.hostname, bucket_name, error_entry['Key'])
+                object_cache.invalidate(self.hostname, bucket_name, error_entry['Key'])
+            for key in chunk:
+                if key not in failed:
+                    if summary:
+                        result['Deleted'] += 1
+                    else:
+                        result['Deleted'].append(key)
+                    existence_cache.set_object(self.hostname, bucket_name, key, False)
+                    object_cache.invalidate(self.hostname, bucket_name, key)
+        return result
+
+    def _delete_chunk(self, bucket_name: str, object_paths: list) -> dict:
+        return self.client_for('delete_objects').delete_objects(
+            Bucket=bucket_name, Delete={'Objects': [{'Key': key} for key in object_paths], 'Quiet': True})
+
+    @instrumented
+    def delete_prefix(self, bucket_name: str, prefix: str, max_workers: int = None, summary: bool = False) -> dict:
+        """
+        This function is used to delete every object under the prefix from the specified bucket.
+        Keys are streamed from a paginated listing, but every deleted key is kept in the result unless summary is set,
+        in which case memory only grows with the number of failed deletions.
+        @param bucket_name: S3 Bucket Name
+        @param prefix: Folder prefix (e.x : prefix='temp/'), must not be empty
+        @param max_workers: Number of concurrent DeleteObjects requests (Default S3_BULK_MAX_WORKERS)
+        @param summary: Count the deleted objects instead of listing them, for very large prefixes
+        @return: {'Deleted': [object_path, ...], 'Errors': [{'Key': object_path, 'Code': ..., 'Message': ...}, ...]}
+                 'Deleted' is the number of deleted objects when summary is set
+        """
+        if not prefix:
+            logger.info("Empty prefix passed to delete_prefix, Refusing to delete the whole bucket")
+            return {'Deleted': 0 if summary else [], 'Errors': []}
+        logger.warning("Deleting all the Files from Bucket: %s with prefix: %s", bucket_name, prefix)
+        listing_errors = []
+
+        def _keys():
+            try:
+                for obj in self.iter_objects(bucket_name, prefix=prefix):
+                    yield obj['Key']
+            except ClientError as e:
+                logger.exception(f"Client Error Occured During Listing Files (delete_prefix) : {e}")
+                listing_errors.append({'Key': prefix, 'Code': e.response['Error'].get('Code', ''), 'Message': str(e)})
+
+        result = self.delete_objects(bucket_name, _keys(), max_workers=max_workers, summary=summary)
+        result['Errors'].extend(listing_errors)
+        return result
+
+    @instrumented
+    def copy_object(self,
+                    source_bucket_name: str,
+                    source_object_path: str,
+                    bucket_name: str,
+                    object_path: str,
+                    max_concurrency: int = None) -> bool:
+        """
+        This function is used to copy an object on the storage server, without downloading it.
+        Objects up to S3_COPY_MULTIPART_THRESHOLD (max 5GB) are copied with a single CopyObject request, larger ones
+        with parallel UploadPartCopy requests. The content type and metadata of the source object are kept.
+        @param source_bucket_name: S3 Bucket Name of the source object
+        @param source_object_path: Path of the source object, e.x : source_object_path='temp/a.txt'
+        @param bucket_name: S3 Bucket Name of the copy
+        @param object_path: Path of the copy, e.x : object_path='archive/a.txt'
+        @param max_concurrency: Number of concurrent UploadPartCopy requests (Default S3_TRANSFER_MAX_CONCURRENCY)
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        logger.debug("Copying File from Bucket: %s with path: %s to Bucket: %s with path: %s",
+                     source_bucket_name, source_object_path, bucket_name, object_path)
+        try:
+            self._copy_item(source_bucket_name, source_object_path, bucket_name, object_path,
+                            max_concurrency=max_concurrency)
+            return True
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Copying File (copy_object) : {e}")
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Copying File (copy_object) : {e}")
+        existence_cache.invalidate_object(self.hostname, bucket_name, object_path)
+        object_cache.invalidate(self.hostname, bucket_name, object_path)
+        return False
+
+    @instrumented
+    def move_object(self,
+                    source_bucket_name: str,
+                    source_object_path: str,
+                    bucket_name: str,
+                    object_path: str,
+                    max_concurrency: int = None) -> bool:
+        """
+        This function is used to move an object on the storage server: it is copied (see copy_object), then the
+        source object is deleted. The source is kept if the copy fails.
+        @param source_bucket_name: S3 Bucket Name of the source object
+        @param source_object_path: Path of the source object, e.x : source_object_path='temp/a.txt'
+        @param bucket_name: S3 Bucket Name of the destination
+        @param object_path: Path of the destination, e.x : object_path='archive/a.txt'
+        @param max_concurrency: Number of concurrent UploadPartCopy requests (Default S3_TRANSFER_MAX_CONCURRENCY)
+        @return: Success - Returns True
+                 Failure - Returns False
+        """
+        if (source_bucket_name, source_object_path) == (bucket_name, object_path):
+            logger.info("Source and destination of move_object are the same object, Nothing to move")
+            return False
+        if not self.copy_object(source_bucket_name, source_object_path, bucket_name, object_path,
+                                max_concurrency=max_concurrency):
+            return False
+        try:
+            self.client_for('delete_object').delete_object(Bucket=source_bucket_name, Key=source_object_path)
+            existence_cache.set_object(self.hostname, source_bucket_name, source_object_path, False)
+            object_cache.invalidate(self.hostname, source_bucket_name, source_object_path)
+            return True
+        except ClientError as e:
+            logger.exception(f"Client Error Occured During Deleting Moved File (move_object) : {e}")
+        except Exception as e:
+            logger.exception(f"Unhandled Exception Occured During Deleting Moved File (move_object) : {e}")
+        existence_cache.invalidate_object(self.hostname, source_bucket_name, source_object_path)
+        object_cache.invalidate(self.hostname, source_bucket_name, source_object_path)
+        return False
+
+    @instrumented
+    def copy_prefix(self,
+                    source_bucket_name: str,
+                    source_prefix: str,
+                    bucket_name: str,
+                    prefix: str,
+                    max_workers: int = None) -> dict:
+        """
+        This function is used to copy every object under a prefix to another prefix/bucket on the storage server.
+        Keys are streamed from a paginated listing and copied concurrently, e.x : 'tenant/a.txt' is copied to
+        'archive/tenant/a.txt' with source_prefix='tenant/' and prefix='archive/tenant/'.
+        @param source_bucket_name: S3 Bucket Name of the source objects
+        @param source_prefix: Folder prefix of the source objects (e.x : source_prefix='temp/'), must not be empty
+        @param bucket_name: S3 Bucket Name of the copies
+        @param prefix: Folder prefix replacing source_prefix in the paths of the copies
+        @param max_workers: Number of concurrent copies (Default S3_BULK_MAX_WORKERS)
+        @return: {'Copied': [source_object_path, ...],
+                  'Errors': [{'Key': source_object_path, 'Code': ..., 'Message': ...}, ...]}
+        """
+        result = {'Copied': [], 'Errors': []}
+        for object_path, error in self._copy_prefix(source_bucket_name, source_prefix, bucket_name, prefix,
+                                                    max_workers, 'copy_prefix'):
+            if error is None:
+                result['Copied'].append(object_path)
+            else:
+                result['Errors'].append(error)
+        return result
+
+    @instrumented
+    def move_prefix(self,
+                    source_bucket_name: str,
+                    source_prefix: str,
+                    bucket_name: str,
+                    prefix: str,
+                    max_workers: int = None) -> dict:
+        """
+        This function is used to move every object under a prefix to another prefix/bucket on the storage server.
+        Objects are copied as in copy_prefix, and the copied source objects are deleted with DeleteObjects requests
+        as the copies complete. Source objects whose copy failed are kept.
+        @param source_bucket_name: S3 Bucket Name of the source objects
+        @param source_prefix: Folder prefix of the source objects (e.x : source_prefix='temp/'), must not be empty
+        @param bucket_name: S3 Bucket Name of the destination
+        @param prefix: Folder prefix replacing source_prefix in the destination paths
+        @param max_workers: Number of concurrent copies and DeleteObjects requests (Default S3_BULK_MAX_WORKERS)
+        @return: {'Moved': [source_object_path, ...],
+                  'Errors': [{'Key': source_object_path, 'Code': ..., 'Message': ...}, ...]}
+        """
+        copy_errors = []
+
+        def _copied():
+            for object_path, error in self._copy_prefix(source_bucket_name, source_prefix, bucket_name, prefix,
+                                                        max_workers, 'move_prefix'):
+                if error is None:
+                    yield object_path
+                else:
+                    copy_errors.append(error)
+
+        result = self.delete_objects(source_bucket_name, _copied(), max_workers=max_workers)
+        return {'Moved': result['Deleted'], 'Errors': copy_errors + result['Errors']}
+
+    def _copy_prefix(self, source_bucket_name: str, source_prefix: str, bucket_name: str, prefix: str,
+                     max_workers: int, method_name: str):
+        """
+        Copies the objects under source_prefix on a bounded thread pool.
+        @return: Generator of (source_object_path, error) tuples in completion order, error is None on success
+        """
+        if not source_prefix:
+            logger.info("Empty prefix passed to %s, Refusing to copy the whole bucket", method_name)
+            return
+        prefix = prefix or EMPTY_STRING
+        if source_bucket_name == bucket_name and prefix.startswith(source_prefix):
+            # The copies would be listed (and copied again) while the listing runs
+            logger.error("Destination prefix is inside the source prefix (%s)", method_name)
+            yield source_prefix, {'Key': source_prefix, 'Code': 'InvalidDestination',
+                                  'Message': 'The destination prefix is inside the source prefix'}
+            return
+        logger.warning("Copying all the Files from Bucket: %s with prefix: %s to Bucket: %s with prefix: %s",
+                       source_bucket_name, source_prefix, bucket_name, prefix)
+        listing_errors = []
+
+        def _objects():
+            try:
+                yield from self.iter_objects(source_bucket_name, prefix=source_prefix)
+            except ClientError as e:
+                logger.exception(f"Client Error Occured During Listing Files ({method_name}) : {e}")
+                listing_errors.append({'Key': source_prefix, 'Code': e.response['Error'].get('Code', ''),
+                                       'Message': str(e)})
+
+        def _copy(obj):
+            self._copy_item(source_bucket_name, obj['Key'], bucket_name, prefix + obj['Key'][len(source_prefix):],
+                            size=obj['Size'])
+
+        max_workers = max_workers or getattr(settings, 'S3_BULK_MAX_WORKERS', DEFAULT_BULK_MAX_WORKERS)
+        for obj, _, error in bounded_map(_copy, _objects(), max_workers, thread_name_prefix='s3lib-copy'):
+            if error is None:
+                yield obj['Key'], None
+                continue
+            logger.error("Exception Occured During Copying File %s (%s) : %s", obj['Key'], method_name, error)
+            existence_cache.invalidate_object(self.hostname, bucket_name, prefix + obj['Key'][len(source_prefix):])
+            object_cache.invalidate(self.hostname, bucket_name, prefix + obj['Key'][len(source_prefix):])
+            code = error.response['Error'].get('Code', '') if isinstance(error, ClientError) else 'Exception'
+            yield obj['Key'], {'Key': obj['Key'], 'Code': code, 'Message': str(error)}
+        for error in listing_errors:
+            yield error['Key'], error
+
+    def _copy_item(self, source_bucket_name: str, source_object_path: str, bucket_name: str, object_path: str,
+                   size: int = None, max_concurrency: int = None):
+        """
+        Copies one object server side, raises on failure.
+        @param size: Size of the source object if already known (e.x : from a listing), it is fetched otherwise
+        """
+        threshold = get_copy_multipart_threshold()
+        head = None
+        if size is None or size > threshold:
+            head = self.client_for('head_object').head_object(Bucket=source_bucket_name, Key=source_object_path)
+            size = head['ContentLength']
+        if size > threshold:
+            self._multipart_copy(source_bucket_name, source_object_path, bucket_name, object_path, head,
+                                 max_concurrency)
+        else:
+            self.client_for('copy_object').copy_object(Bucket=bucket_name, Key=object_path,
+                                                       CopySource={'Bucket': source_bucket_name,
+                                                                   'Key': source_object_path})
+        existence_cache.set_object(self.hostname, bucket_name, object_path, True)
+        object_cache.invalidate(self.hostname, bucket_name, object_path)
+
+    def _multipart_copy(self, source_bucket_name: str, source_object_path: str, bucket_name: str, object_path: str,
+                        head: dict, max_concurrency: int = None):
+        """
+        Copies a large object with UploadPartCopy requests run concurrently. Every part is copied from the same
+        version of the source (If-Match on its ETag), and the upload is aborted if any part fails.
+        """
+        client = self.client_for('upload_part_copy')
+        copy_source = {'Bucket': source_bucket_name, 'Key': source_object_path}
+        # Unlike CopyObject, a multipart upload does not copy the headers and metadata of the source
+        extra_args = {name: head[name] for name in ('ContentType', 'ContentEncoding', 'ContentDisposition',
+                                                    'ContentLanguage', 'CacheControl', 'Metadata') if head.get(name)}
+        upload_id = client.create_multipart_upload(Bucket=bucket_name, Key=object_path, **extra_args)['UploadId']
+
+        def _copy_part(part):
+            part_number, first_byte, last_byte = part
+            response = client.upload_part_copy(Bucket=bucket_name, Key=object_path, UploadId=upload_id,
+                                               PartNumber=part_number, CopySource=copy_source,
+                                               CopySourceRange=f"bytes={first_byte}-{last_byte}",
+                                               CopySourceIfMatch=head['ETag'])
+            return {'PartNumber': part_number, 'ETag': response['CopyPartResult']['ETag']}
+
+        max_concurrency = max_concurrency or getattr(settings, 'S3_TRANSFER_MAX_CONCURRENCY',
+                                                     DEFAULT_TRANSFER_MAX_CONCURRENCY)
+        try:
+            parts = []
+            with closing(bounded_map(_copy_part, copy_part_ranges(head['ContentLength']), max_concurrency,
+                                     thread_name_prefix='s3lib-copy-part')) as results:
+                for _, part, error in results:
+                    if error is not None:
+                        raise error
+                    parts.append(part)
+            parts.sort(key=lambda part: part['PartNumber'])
+            client.complete_multipart_upload(Bucket=bucket_name, Key=object_path, UploadId=upload_id,
+                                             MultipartUpload={'Parts': parts})
+        except Exception:
+            client.abort_multipart_upload(Bucket=bucket_name, Key=object_path, UploadId=upload_id)
+            raise
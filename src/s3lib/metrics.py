@@ -0,0 +1,240 @@
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+METHOD_DURATION = 's3lib.method.duration'
+METHOD_API_CALLS = 's3lib.method.api_calls'
+REQUEST_DURATION = 's3lib.request.duration'
+REQUEST_COUNT = 's3lib.request.count'
+REQUEST_RETRIES = 's3lib.request.retries'
+BYTES_SENT = 's3lib.bytes.sent'
+BYTES_RECEIVED = 's3lib.bytes.received'
+CACHE_HIT = 's3lib.cache.hit'
+CACHE_MISS = 's3lib.cache.miss'
+
+
+class MetricsSink:
+    """
+    Receives the metrics of s3lib. This base class is the default and drops everything.
+    Counters are reported with increment, latencies (seconds) and other distributions with observe.
+    """
+
+    def increment(self, name: str, value: int = 1, tags: dict = None):
+        pass
+
+    def observe(self, name: str, value: float, tags: dict = None):
+        pass
+
+
+class CallbackSink(MetricsSink):
+    """
+    Forwards the metrics to callables, to plug a Prometheus/statsd client.
+    e.x :
+        CallbackSink(increment=lambda name, value, tags: statsd.incr(name, value, tags=tags),
+                     observe=lambda name, value, tags: statsd.histogram(name, value, tags=tags))
+    """
+
+    def __init__(self, increment=None, observe=None):
+        self._increment = increment
+        self._observe = observe
+
+    def increment(self, name: str, value: int = 1, tags: dict = None):
+        if self._increment is not None:
+            self._increment(name, value, tags or {})
+
+    def observe(self, name: str, value: float, tags: dict = None):
+        if self._observe is not None:
+            self._observe(name, value, tags or {})
+
+
+class InMemorySink(MetricsSink):
+    """
+    Keeps every metric in memory, for tests and benchmarks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.observations = defaultdict(list)
+
+    @staticmethod
+    def _key(name: str, tags: dict):
+        return name, tuple(sorted((tags or {}).items()))
+
+    def increment(self, name: str, value: int = 1, tags: dict = None):
+        with self._lock:
+            self.counters[self._key(name, tags)] += value
+
+    def observe(self, name: str, value: float, tags: dict = None):
+        with self._lock:
+            self.observations[self._key(name, tags)].append(value)
+
+    def count(self, name: str, **tags) -> int:
+        """
+        @return: Sum of the counter over every tag set containing the given tags
+        """
+        with self._lock:
+            return sum(value for (key, key_tags), value in self.counters.items()
+                       if key == name and set(tags.items()) <= set(key_tags))
+
+    def values(self, name: str, **tags) -> list:
+        """
+        @return: Observed values over every tag set containing the given tags
+        """
+        with self._lock:
+            return [value for (key, key_tags), values in self.observations.items()
+                    if key == name and set(tags.items()) <= set(key_tags) for value in values]
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.observations.clear()
+
+
+_NOOP_SINK = MetricsSink()
+_sink = None
+
+
+def get_sink() -> MetricsSink:
+    """
+    Returns the active sink. On first use it is built from the S3_METRICS_SINK setting (dotted path of a
+    MetricsSink subclass or factory), by default metrics are dropped.
+    """
+    global _sink
+    if _sink is None:
+        path = getattr(settings, 'S3_METRICS_SINK', None)
+        if path:
+            from django.utils.module_loading import import_string
+
+            _sink = import_string(path)()
+        else:
+            _sink = _NOOP_SINK
+    return _sink
+
+
+def set_sink(sink: MetricsSink):
+    """
+    Replaces the active sink, None restores the one configured in settings.
+    """
+    global _sink
+    _sink = sink
+
+
+def is_enabled() -> bool:
+    return get_sink() is not _NOOP_SINK
+
+
+class _Scope:
+    # Counts the API calls made while a BotoMinio method runs, nested methods count for their callers too.
+    def __init__(self, parent):
+        self.parent = parent
+        self.api_calls = 0
+        self._lock = threading.Lock()
+
+    def add_api_call(self):
+        scope = self
+        while scope is not None:
+            with scope._lock:
+                scope.api_calls += 1
+            scope = scope.parent
+
+
+_current_scope = contextvars.ContextVar('s3lib_metrics_scope', default=None)
+
+
+def instrumented(func):
+    """
+    Decorator reporting the duration and the number of API calls of a BotoMinio method.
+    Worker threads submitted through bounded_map run in a copy of the caller's context, so their calls are
+    counted for the method that started them.
+    Requests made by the boto3 managed transfer threads (multipart upload_file) are only reported as request
+    metrics.
+    """
+    tags = {'method': func.__name__}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return func(*args, **kwargs)
+        scope = _Scope(_current_scope.get())
+        token = _current_scope.set(scope)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_scope.reset(token)
+            sink = get_sink()
+            sink.observe(METHOD_DURATION, elapsed, tags)
+            sink.observe(METHOD_API_CALLS, scope.api_calls, tags)
+
+    return wrapper
+
+
+def record_cache(cache_name: str, hit: bool):
+    if is_enabled():
+        get_sink().increment(CACHE_HIT if hit else CACHE_MISS, tags={'cache': cache_name})
+
+
+def _content_length(headers) -> int:
+    try:
+        return int(headers.get('Content-Length') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _before_call(model, context, **kwargs):
+    context['s3lib_start'] = time.perf_counter()
+    context['s3lib_operation'] = model.name
+
+
+def _before_send(request, **kwargs):
+    # Fired for every HTTP attempt, retries included
+    if is_enabled():
+        sent = _content_length(request.headers)
+        if sent:
+            get_sink().increment(BYTES_SENT, sent)
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    _record_request(model.name, context, str(http_response.status_code),
+                    parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0),
+                    _content_length(http_response.headers))
+
+
+def _after_call_error(exception, context, **kwargs):
+    operation = context.get('s3lib_operation', 'unknown')
+    _record_request(operation, context, type(exception).__name__, 0, 0)
+
+
+def _record_request(operation: str, context: dict, status: str, retries: int, received: int):
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.add_api_call()
+    start = context.get('s3lib_start')
+    if not is_enabled() or start is None:
+        return
+    sink = get_sink()
+    tags = {'operation': operation}
+    sink.observe(REQUEST_DURATION, time.perf_counter() - start, tags)
+    sink.increment(REQUEST_COUNT, tags={'operation': operation, 'status': status})
+    if retries:
+        sink.increment(REQUEST_RETRIES, retries, tags)
+    if received:
+        sink.increment(BYTES_RECEIVED, received, tags)
+
+
+def register_client_hooks(client):
+    """
+    Hooks the metrics handlers into the botocore event system of the client, capturing every request it makes.
+    @param client: boto3 (or aiobotocore) client
+    """
+    events = client.meta.events
+    events.register('before-call', _before_call)
+    events.register('before-send', _before_send)
+    events.register('after-call', _after_call)
+    events.register('after-call-error', _after_call_error)
@@ -0,0 +1,113 @@
+import io
+
+DEFAULT_READ_AHEAD = 1024 * 1024
+
+
+def readinto_fully(body, view: memoryview):
+    """
+    Reads a botocore StreamingBody into the writable view until it is full, without intermediate copies when the
+    installed botocore supports readinto.
+    @param body: botocore StreamingBody
+    @param view: Writable memoryview to be filled
+    """
+    filled = 0
+    size = len(view)
+    while filled < size:
+        if hasattr(body, 'readinto'):
+            count = body.readinto(view[filled:])
+        else:
+            chunk = body.read(size - filled)
+            count = len(chunk)
+            view[filled:filled + count] = chunk
+        if not count:
+            raise IOError(f"Connection closed after {filled} of {size} bytes")
+        filled += count
+    body.close()
+
+
+def get_range_into(client, bucket_name: str, object_path: str, start: int, view: memoryview, etag: str = None):
+    """
+    Fetches len(view) bytes of the object starting at offset start (HTTP Range GET) into the view.
+    @param client: boto3 S3 client
+    @param bucket_name: S3 Bucket Name
+    @param object_path: This is the path in S3 (inside Specified Bucket)
+    @param start: Offset of the first byte
+    @param view: Writable memoryview to be filled
+    @param etag: If given, the request fails (412) when the object changed since the ETag was read
+    """
+    params = {'Bucket': bucket_name, 'Key': object_path, 'Range': f"bytes={start}-{start + len(view) - 1}"}
+    if etag:
+        params['IfMatch'] = etag
+    response = client.get_object(**params)
+    readinto_fully(response['Body'], view)
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Seekable, read only file-like object over an S3 object.
+    Data is fetched on demand with HTTP Range GETs. Small reads are served from a read-ahead buffer of
+    read_ahead bytes, large reads are fetched directly into the caller's buffer.
+    Every range is requested with the ETag read when opening, so a concurrent overwrite fails the read
+    instead of mixing two versions of the object.
+    """
+
+    def __init__(self, client, bucket_name: str, object_path: str, read_ahead: int = DEFAULT_READ_AHEAD):
+        response = client.head_object(Bucket=bucket_name, Key=object_path)
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_path = object_path
+        self.size = response['ContentLength']
+        self.etag = response.get('ETag')
+        self.content_type = response.get('ContentType')
+        self.read_ahead = read_ahead
+        self._position = 0
+        self._buffer_start = 0
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, b):
+        view = memoryview(b).cast('B')
+        size = min(len(view), max(self.size - self._position, 0))
+        filled = 0
+        while filled < size:
+            position = self._position + filled
+            offset = position - self._buffer_start
+            if 0 <= offset < len(self._buffer):
+                count = min(size - filled, len(self._buffer) - offset)
+                view[filled:filled + count] = self._buffer[offset:offset + count]
+            elif size - filled >= self.read_ahead:
+                count = size - filled
+                get_range_into(self.client, self.bucket_name, self.object_path, position,
+                               view[filled:filled + count], self.etag)
+            else:
+                buffer = bytearray(min(self.read_ahead, self.size - position))
+                get_range_into(self.client, self.bucket_name, self.object_path, position, memoryview(buffer),
+                               self.etag)
+                self._buffer_start = position
+                self._buffer = buffer
+                continue
+            filled += count
+        self._position += filled
+        return filled
@@ -0,0 +1,207 @@
+import threading
+import time
+
+from botocore.exceptions import ConnectionError as EndpointUnreachableError, HTTPClientError
+from django.conf import settings
+
+from .metrics import get_sink, is_enabled
+
+DEFAULT_RETRY_MODE = 'standard'
+DEFAULT_RETRY_MAX_ATTEMPTS = 3
+DEFAULT_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = 30
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+CIRCUIT_STATE_CHANGE = 's3lib.circuit.state_change'
+CIRCUIT_REJECTED = 's3lib.circuit.rejected'
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the circuit breaker of the endpoint is open.
+    """
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"Circuit breaker open for {endpoint}, requests are rejected for {retry_in:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Per endpoint circuit breaker.
+    After failure_threshold consecutive failed calls (connection errors, timeouts or 5xx responses, counted after
+    botocore retries) the circuit opens and every call fails fast with CircuitOpenError. Once recovery_timeout
+    seconds have passed, a single probe call is let through (half open): its success closes the circuit, its
+    failure opens it again.
+    """
+
+    def __init__(self, endpoint: str, failure_threshold: int, recovery_timeout: float):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError if the call must not be sent.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            retry_in = self.recovery_timeout - (time.monotonic() - self._opened_at)
+            if retry_in <= 0 and not self._probe_in_flight:
+                self._set_state(HALF_OPEN)
+                self._probe_in_flight = True
+                return
+            self.total_rejected += 1
+        if is_enabled():
+            get_sink().increment(CIRCUIT_REJECTED, tags={'endpoint': self.endpoint})
+        raise CircuitOpenError(self.endpoint, max(retry_in, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != OPEN:
+                    self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        self._state = state
+        if is_enabled():
+            get_sink().increment(CIRCUIT_STATE_CHANGE, tags={'endpoint': self.endpoint, 'state': state})
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        """
+        @return: State of the breaker, for dashboards/health checks
+        """
+        state = self.state
+        with self._lock:
+            return {
+                'endpoint': self.endpoint,
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'recovery_timeout': self.recovery_timeout,
+                'retry_in': max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0.0)
+                if self._state == OPEN else 0.0,
+                'total_failures': self.total_failures,
+                'total_rejected': self.total_rejected,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of the endpoint, shared by every client of the process talking to it.
+    Thresholds come from S3_CIRCUIT_BREAKER_FAILURE_THRESHOLD and S3_CIRCUIT_BREAKER_RECOVERY_TIMEOUT.
+    """
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint,
+                                         getattr(settings, 'S3_CIRCUIT_BREAKER_FAILURE_THRESHOLD',
+                                                 DEFAULT_CIRCUIT_BREAKER_FAILURE_THRESHOLD),
+                                         getattr(settings, 'S3_CIRCUIT_BREAKER_RECOVERY_TIMEOUT',
+                                                 DEFAULT_CIRCUIT_BREAKER_RECOVERY_TIMEOUT))
+                _breakers[endpoint] = breaker
+    return breaker
+
+
+def circuit_breaker_states() -> dict:
+    """
+    @return: Dict of endpoint to CircuitBreaker.snapshot() for every endpoint used by the process
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.endpoint: breaker.snapshot() for breaker in breakers}
+
+
+def retry_config() -> dict:
+    """
+    @return: botocore retries config from S3_RETRY_MODE ('standard' or 'adaptive', both use exponential backoff
+             with jitter, adaptive also rate limits the client while throttled) and S3_RETRY_MAX_ATTEMPTS
+    """
+    return {'mode': getattr(settings, 'S3_RETRY_MODE', DEFAULT_RETRY_MODE),
+            'max_attempts': getattr(settings, 'S3_RETRY_MAX_ATTEMPTS', DEFAULT_RETRY_MAX_ATTEMPTS)}
+
+
+def operation_timeouts(operation: str):
+    """
+    Returns the (connect_timeout, read_timeout) deadline configured for the client method in the
+    S3_OPERATION_TIMEOUTS setting, or None to use the default ones.
+    e.x : S3_OPERATION_TIMEOUTS = {'head_object': (1, 2), 'head_bucket': (1, 2), 'get_object': (5, 120)}
+    """
+    timeouts = getattr(settings, 'S3_OPERATION_TIMEOUTS', None) or {}
+    value = timeouts.get(operation)
+    return tuple(value) if value else None
+
+
+def register_resilience_hooks(client, endpoint: str):
+    """
+    Hooks the circuit breaker of the endpoint into the botocore event system of the client, so every call made
+    with it (paginators and managed transfers included) is guarded. Disabled by S3_CIRCUIT_BREAKER_ENABLED = False.
+    @param client: boto3 (or aiobotocore) client
+    @param endpoint: Endpoint URL of the client
+    """
+    if not getattr(settings, 'S3_CIRCUIT_BREAKER_ENABLED', True):
+        return
+    breaker = get_circuit_breaker(endpoint)
+
+    def _before_call(**kwargs):
+        breaker.before_call()
+
+    def _after_call(http_response, **kwargs):
+        if http_response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def _after_call_error(exception, **kwargs):
+        # Connection errors and timeouts mean the backend is unreachable, anything else is not its fault
+        if isinstance(exception, (EndpointUnreachableError, HTTPClientError, OSError)):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    events = client.meta.events
+    events.register('before-call', _before_call)
+    events.register('after-call', _after_call)
+    events.register('after-call-error', _after_call_error)
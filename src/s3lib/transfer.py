@@ -0,0 +1,96 @@
+import io
+
+from django.conf import settings
+
+MB = 1024 * 1024
+DEFAULT_MULTIPART_THRESHOLD = 8 * MB
+DEFAULT_MULTIPART_CHUNKSIZE = 8 * MB
+DEFAULT_TRANSFER_MAX_CONCURRENCY = 10
+COPY_OBJECT_MAX_SIZE = 5 * 1024 * MB
+DEFAULT_COPY_PART_SIZE = 256 * MB
+MULTIPART_MAX_PARTS = 10000
+
+
+def get_transfer_config(transfer_config=None):
+    """
+    Returns the TransferConfig used by the managed (multipart) uploads.
+    Defaults come from the settings S3_MULTIPART_THRESHOLD, S3_MULTIPART_CHUNKSIZE, S3_TRANSFER_MAX_CONCURRENCY
+    and S3_TRANSFER_MAX_BANDWIDTH (bytes per second, None for unlimited).
+    @param transfer_config: TransferConfig used as is, or dict overriding some of the defaults
+                            e.x : transfer_config={'multipart_chunksize': 64 * 1024 * 1024, 'max_concurrency': 4}
+    @return: TransferConfig
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    if isinstance(transfer_config, TransferConfig):
+        return transfer_config
+    options = {
+        'multipart_threshold': getattr(settings, 'S3_MULTIPART_THRESHOLD', DEFAULT_MULTIPART_THRESHOLD),
+        'multipart_chunksize': getattr(settings, 'S3_MULTIPART_CHUNKSIZE', DEFAULT_MULTIPART_CHUNKSIZE),
+        'max_concurrency': getattr(settings, 'S3_TRANSFER_MAX_CONCURRENCY', DEFAULT_TRANSFER_MAX_CONCURRENCY),
+        'max_bandwidth': getattr(settings, 'S3_TRANSFER_MAX_BANDWIDTH', None),
+    }
+    if transfer_config:
+        options.update(transfer_config)
+    return TransferConfig(**options)
+
+
+def get_copy_multipart_threshold() -> int:
+    """
+    @return: Size above which objects are copied with parallel UploadPartCopy requests instead of a single CopyObject,
+             from S3_COPY_MULTIPART_THRESHOLD (at most 5GB, the largest object CopyObject accepts)
+    """
+    return min(getattr(settings, 'S3_COPY_MULTIPART_THRESHOLD', COPY_OBJECT_MAX_SIZE), COPY_OBJECT_MAX_SIZE)
+
+
+def copy_part_ranges(size: int) -> list:
+    """
+    Splits an object into the byte ranges of a multipart copy, S3_COPY_PART_SIZE bytes each (grown if needed to
+    stay within the 10000 parts limit).
+    @param size: Size of the object in bytes
+    @return: List of (part_number, first_byte, last_byte) tuples
+    """
+    part_size = max(getattr(settings, 'S3_COPY_PART_SIZE', DEFAULT_COPY_PART_SIZE), -(-size // MULTIPART_MAX_PARTS))
+    return [(index + 1, start, min(start + part_size, size) - 1)
+            for index, start in enumerate(range(0, size, part_size))]
+
+
+class IterableStream(io.RawIOBase):
+    """
+    Non seekable, read only file-like object over an iterable of bytes chunks (e.x : a generator).
+    Chunks are pulled only when read, so the multipart upload reading from it holds at most a few parts in memory.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        # Unlike RawIOBase.read, returns short only at the end of the stream: the transfer manager decides between
+        # a single PUT and a multipart upload from the length of its first read.
+        if size is None or size < 0:
+            return self.readall()
+        buffer = bytearray(size)
+        filled = 0
+        with memoryview(buffer) as view:
+            while filled < size:
+                count = self.readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+        del buffer[filled:]
+        return bytes(buffer)
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = memoryview(next(self._chunks)).cast('B')
+            except StopIteration:
+                return 0
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
@@ -0,0 +1,52 @@
+"""
+In-process moto server shared by the test modules. Django settings can only be configured once per process, so
+the server is started by the first module that needs it and stopped when the interpreter exits.
+"""
+import atexit
+import logging
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+try:
+    from moto.server import ThreadedMotoServer
+except ImportError:  # pragma: no cover
+    ThreadedMotoServer = None
+
+_endpoint = None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start() -> str:
+    """
+    Starts the server (once) and points the library settings at it, skips the calling module if moto[server]
+    is not installed.
+    @return: Endpoint URL of the server
+    """
+    global _endpoint
+    from django.conf import settings
+
+    if ThreadedMotoServer is None:
+        raise unittest.SkipTest('moto[server] is required for the storage server tests')
+    if _endpoint is None:
+        port = _free_port()
+        server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+        server.start()
+        # The request log of the server is of no use in the test output
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        atexit.register(server.stop)
+        _endpoint = f'http://127.0.0.1:{port}/'
+        settings.configure(STORAGE_SERVICE='s3', S3_ACCESS_KEY='testing', S3_SECRET_KEY='testing',
+                           S3_INTERNAL_HOST_URL=_endpoint, S3_EXTERNAL_HOST_URL=_endpoint,
+                           USE_S3_EXTERNAL_CLIENT=False, STORAGE_VERSION='s3v4',
+                           DEFAULT_S3_LINK_EXPIRY_TIMEOUT=3600)
+        os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    return _endpoint
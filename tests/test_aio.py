@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import uuid
+from urllib.request import urlopen
+
+import s3_server
+
+try:
+    import aiobotocore
+except ImportError:  # pragma: no cover
+    aiobotocore = None
+
+
+def setUpModule():
+    if aiobotocore is None:
+        raise unittest.SkipTest('aiobotocore is required for the async client tests')
+    s3_server.start()
+
+
+class AsyncBotoMinioTest(unittest.IsolatedAsyncioTestCase):
+    # Built outside the event loop of the test on purpose, as a module level instance would be
+    max_concurrency = 4
+
+    def setUp(self):
+        from s3lib.aio import AsyncBotoMinio
+        from s3lib.cache import existence_cache
+
+        existence_cache.clear()
+        self.s3 = AsyncBotoMinio(max_concurrency=self.max_concurrency)
+        self.bucket_name = f'aio-{uuid.uuid4().hex[:12]}'
+
+    async def asyncSetUp(self):
+        client = await self.s3._get_client()
+        await client.create_bucket(Bucket=self.bucket_name)
+
+    async def asyncTearDown(self):
+        await self.s3.close()
+
+    async def test_check_bucket_exist(self):
+        self.assertTrue(await self.s3.check_bucket_exist(self.bucket_name))
+        self.assertFalse(await self.s3.check_bucket_exist(f'{self.bucket_name}-missing'))
+
+    async def test_put_object_and_check_object_exist(self):
+        self.assertFalse(await self.s3.check_object_exist(self.bucket_name, 'a.txt'))
+        self.assertTrue(await self.s3.put_object(self.bucket_name, b'hello', 'a.txt', 'text/plain'))
+        self.assertTrue(await self.s3.check_object_exist(self.bucket_name, 'a.txt'))
+        client = await self.s3._get_client()
+        response = await client.get_object(Bucket=self.bucket_name, Key='a.txt')
+        async with response['Body'] as body:
+            self.assertEqual(await body.read(), b'hello')
+        self.assertEqual(response['ContentType'], 'text/plain')
+
+    async def test_upload_file_multipart(self):
+        data = os.urandom(12 * 1024 * 1024)
+        with tempfile.NamedTemporaryFile(suffix='.bin') as file:
+            file.write(data)
+            file.flush()
+            transfer_config = {'multipart_threshold': 5 * 1024 * 1024, 'multipart_chunksize': 5 * 1024 * 1024}
+            self.assertTrue(await self.s3.upload_file(self.bucket_name, file.name, 'big.bin',
+                                                      transfer_config=transfer_config))
+        client = await self.s3._get_client()
+        response = await client.get_object(Bucket=self.bucket_name, Key='big.bin')
+        async with response['Body'] as body:
+            self.assertEqual(await body.read(), data)
+        # Three parts were uploaded, a single PUT would have a plain MD5 ETag
+        self.assertTrue(response['ETag'].endswith('-3"'))
+
+    async def test_upload_file_missing(self):
+        self.assertFalse(await self.s3.upload_file(self.bucket_name, '/nonexistent/file.bin', 'x.bin'))
+
+    async def test_generate_pre_signed_link(self):
+        await self.s3.put_object(self.bucket_name, b'signed', 'signed.txt')
+        link = await self.s3.generate_pre_signed_link(self.bucket_name, 'signed.txt', 60)
+        self.assertIn('X-Amz-Signature', link)
+        response = await asyncio.get_running_loop().run_in_executor(None, lambda: urlopen(link).read())
+        self.assertEqual(response, b'signed')
+        self.assertEqual(await self.s3.generate_pre_signed_link(self.bucket_name, 'missing.txt', 60), '')
+        self.assertIn('X-Amz-Signature',
+                      await self.s3.generate_pre_signed_link(self.bucket_name, 'missing.txt', 60, check_exist=False))
+
+    async def test_delete_object(self):
+        await self.s3.put_object(self.bucket_name, b'x', 'delete.txt')
+        self.assertTrue(await self.s3.delete_object(self.bucket_name, 'delete.txt'))
+        self.assertFalse(await self.s3.check_object_exist(self.bucket_name, 'delete.txt'))
+        self.assertFalse(await self.s3.delete_object(self.bucket_name, 'delete.txt'))
+
+    async def test_iter_objects_and_list_files_by_extension(self):
+        keys = ['a.txt', 'b.csv', 'dir/c.txt', 'dir/sub/d.txt']
+        await asyncio.gather(*(self.s3.put_object(self.bucket_name, b'x', key) for key in keys))
+        listed = [obj['Key'] async for obj in self.s3.iter_objects(self.bucket_name, page_size=2)]
+        self.assertEqual(listed, sorted(keys))
+        listed = [obj['Key'] async for obj in self.s3.iter_objects(self.bucket_name, prefix='dir/', recursive=False)]
+        self.assertEqual(listed, ['dir/c.txt'])
+        listed = [obj['Key'] async for obj in self.s3.iter_objects(self.bucket_name, suffixes='.txt', max_results=2)]
+        self.assertEqual(listed, ['a.txt', 'dir/c.txt'])
+        self.assertEqual(await self.s3.list_files_by_extension(self.bucket_name, '.txt'), [{'Key': 'a.txt'}])
+        self.assertEqual(await self.s3.list_files_by_extension(self.bucket_name, '.txt', include_all_prefix=True),
+                         [{'Key': 'a.txt'}, {'Key': 'dir/c.txt'}, {'Key': 'dir/sub/d.txt'}])
+        self.assertEqual(await self.s3.list_files_by_extension(self.bucket_name, '.txt', prefix='dir/'),
+                         [{'Key': 'dir/c.txt'}, {'Key': 'dir/sub/d.txt'}])
+
+    async def test_gather_above_max_concurrency(self):
+        in_flight = peak = 0
+        client = await self.s3._get_client()
+
+        def _before_call(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+
+        def _after_call(**kwargs):
+            nonlocal in_flight
+            in_flight -= 1
+
+        client.meta.events.register('before-call', _before_call)
+        client.meta.events.register('after-call', _after_call)
+        count = self.max_concurrency * 10
+        results = await asyncio.gather(*(self.s3.put_object(self.bucket_name, str(index).encode(), f'k/{index}')
+                                         for index in range(count)))
+        self.assertEqual(results, [True] * count)
+        self.assertLessEqual(peak, self.max_concurrency)
+        self.assertGreater(peak, 1)
+        listed = [obj async for obj in self.s3.iter_objects(self.bucket_name, prefix='k/')]
+        self.assertEqual(len(listed), count)
+
+
+if __name__ == '__main__':
+    unittest.main()
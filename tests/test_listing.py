@@ -0,0 +1,112 @@
+import unittest
+import uuid
+
+import s3_server
+
+FLAT_KEYS = ['a', 'ab', 'abc', 'abd', 'b', 'b0', 'b1', 'b10', 'c', 'z', 'zz', 'é-key', 'é-key2', '中', '中文'] + \
+            [f'{letter}{index:02d}' for letter in 'AQdkx' for index in range(8)]
+IMG_KEYS = [f'img_{index:04d}.jpg' for index in range(40)] + ['img_0001.jpg.bak']
+NESTED_KEYS = ['a', 'a/', 'a/1.txt', 'a/2.txt', 'a/b/1.txt', 'a/b/2.csv', 'a/b/c/1.txt', 'a/m.txt', 'readme.txt',
+               'z.txt'] + [f'docs/{year}/{index}.txt' for year in (2023, 2024) for index in range(8)] + \
+              [f'logs/{index:03d}.log' for index in range(12)]
+
+
+def setUpModule():
+    s3_server.start()
+
+
+class ParallelListingTest(unittest.TestCase):
+    # Small pages, so every bucket is larger than the first page and gets sharded
+    page_size = 7
+
+    @classmethod
+    def setUpClass(cls):
+        from s3lib.lib import BotoMinio
+
+        cls.s3 = BotoMinio()
+        cls.buckets = {}
+        for name, keys in (('flat', FLAT_KEYS), ('img', IMG_KEYS), ('nested', NESTED_KEYS)):
+            bucket_name = f'list-{name}-{uuid.uuid4().hex[:8]}'
+            cls.s3.client.create_bucket(Bucket=bucket_name)
+            results = cls.s3.put_many(bucket_name, ((b'x', key) for key in keys))
+            assert all(result['Success'] for result in results), results
+            cls.buckets[name] = bucket_name
+
+    def assertSameListing(self, bucket_name, prefix=None, **kwargs):
+        expected = [obj['Key'] for obj in self.s3.iter_objects(bucket_name, prefix=prefix)]
+        for max_workers in (1, 2, 8):
+            with self.subTest(bucket=bucket_name, prefix=prefix, max_workers=max_workers, **kwargs):
+                ordered = [obj['Key'] for obj in self.s3.iter_objects_parallel(
+                    bucket_name, prefix=prefix, max_workers=max_workers, ordered=True, page_size=self.page_size,
+                    **kwargs)]
+                self.assertEqual(ordered, expected)
+                unordered = [obj['Key'] for obj in self.s3.iter_objects_parallel(
+                    bucket_name, prefix=prefix, max_workers=max_workers, page_size=self.page_size, **kwargs)]
+                self.assertEqual(sorted(unordered), expected)
+        return expected
+
+    def test_discovered_shards_match_serial_listing(self):
+        for name, keys in (('flat', FLAT_KEYS), ('img', IMG_KEYS), ('nested', NESTED_KEYS)):
+            self.assertEqual(self.assertSameListing(self.buckets[name]), sorted(keys))
+
+    def test_prefix(self):
+        self.assertEqual(self.assertSameListing(self.buckets['nested'], prefix='a/'),
+                         ['a/', 'a/1.txt', 'a/2.txt', 'a/b/1.txt', 'a/b/2.csv', 'a/b/c/1.txt', 'a/m.txt'])
+        self.assertEqual(len(self.assertSameListing(self.buckets['nested'], prefix='docs/')), 16)
+        self.assertEqual(len(self.assertSameListing(self.buckets['img'], prefix='img_001')), 10)
+        self.assertEqual(self.assertSameListing(self.buckets['flat'], prefix='a'), ['a', 'ab', 'abc', 'abd'])
+        self.assertEqual(self.assertSameListing(self.buckets['flat'], prefix='missing/'), [])
+
+    def test_explicit_shards(self):
+        # Boundaries equal to existing keys end a shard inclusively, others fall between keys or outside the range
+        self.assertSameListing(self.buckets['flat'], shards=['ab', 'b1', 'q', 'é-key'])
+        self.assertSameListing(self.buckets['flat'], shards=['0', '\U0010ffff'])
+        self.assertSameListing(self.buckets['nested'], prefix='a/', shards=['a/', 'a/b/', 'a/b/c/1.txt', 'a/n'])
+        self.assertSameListing(self.buckets['img'], shards=[])
+
+    def test_suffixes_and_max_results(self):
+        expected = [obj['Key'] for obj in self.s3.iter_objects(self.buckets['nested'], suffixes='.txt')]
+        listed = [obj['Key'] for obj in self.s3.iter_objects_parallel(self.buckets['nested'], suffixes=['.txt'],
+                                                                      ordered=True, page_size=self.page_size)]
+        self.assertEqual(listed, expected)
+        listed = [obj['Key'] for obj in self.s3.iter_objects_parallel(self.buckets['img'], ordered=True,
+                                                                      max_results=5, page_size=self.page_size)]
+        self.assertEqual(listed, sorted(IMG_KEYS)[:5])
+        listed = list(self.s3.iter_objects_parallel(self.buckets['img'], max_results=5, page_size=self.page_size))
+        self.assertEqual(len(listed), 5)
+
+    def test_sampled_boundaries(self):
+        for name in ('flat', 'img', 'nested'):
+            for max_workers in (2, 8):
+                with self.subTest(bucket=name, max_workers=max_workers):
+                    boundaries = self.s3._sample_list_boundaries(self.buckets[name], '', max_workers)
+                    self.assertEqual(boundaries, sorted(set(boundaries)))
+                    self.assertTrue(boundaries)
+        # The chain of prefixes shared by every key ('i', 'im' ... 'img_00') is skipped in one step
+        self.assertEqual(self.s3._sample_list_boundaries(self.buckets['img'], '', 2),
+                         ['img_001', 'img_002', 'img_003'])
+        # Fewer prefixes than workers are expanded once more
+        self.assertEqual(len(self.s3._sample_list_boundaries(self.buckets['img'], '', 8)), len(IMG_KEYS) - 2)
+        boundaries = self.s3._sample_list_boundaries(self.buckets['nested'], 'a/', 8)
+        self.assertTrue(all(boundary.startswith('a/') for boundary in boundaries))
+
+    def test_single_page_is_not_sharded(self):
+        self.assertEqual(self.s3._discover_list_boundaries(self.buckets['flat'], None, 1000, 8), [])
+        self.assertNotEqual(self.s3._discover_list_boundaries(self.buckets['flat'], None, self.page_size, 8), [])
+
+    def test_list_files_by_extension_serial_and_parallel(self):
+        from django.conf import settings
+
+        expected = [{'Key': key} for key in sorted(IMG_KEYS) if key.endswith('.jpg')]
+        for max_workers in (1, 4):
+            with self.subTest(max_workers=max_workers):
+                settings.S3_LIST_MAX_WORKERS = max_workers
+                try:
+                    self.assertEqual(self.s3.list_files_by_extension(self.buckets['img'], '.jpg',
+                                                                     include_all_prefix=True), expected)
+                finally:
+                    del settings.S3_LIST_MAX_WORKERS
+
+
+if __name__ == '__main__':
+    unittest.main()
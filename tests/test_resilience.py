@@ -0,0 +1,150 @@
+import time
+import unittest
+from unittest import mock
+
+import s3_server
+
+
+def setUpModule():
+    s3_server.start()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        from s3lib import resilience
+        from s3lib.metrics import InMemorySink, set_sink
+
+        self.clock = _Clock()
+        patcher = mock.patch.object(resilience, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sink = InMemorySink()
+        set_sink(self.sink)
+        self.addCleanup(set_sink, None)
+        self.breaker = resilience.CircuitBreaker('http://breaker.test/', failure_threshold=3, recovery_timeout=10)
+
+    def _fail(self, count):
+        for _ in range(count):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        from s3lib.resilience import CircuitOpenError, CLOSED, OPEN
+
+        self._fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        # A success resets the count of consecutive failures
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self._fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self._fail(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now += 4
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.before_call()
+        self.assertAlmostEqual(context.exception.retry_in, 6)
+        snapshot = self.breaker.snapshot()
+        self.assertEqual((snapshot['state'], snapshot['consecutive_failures'], snapshot['total_failures'],
+                          snapshot['total_rejected']), (OPEN, 3, 5, 1))
+        self.assertAlmostEqual(snapshot['retry_in'], 6)
+        self.assertEqual(self.sink.count('s3lib.circuit.rejected'), 1)
+        self.assertEqual(self.sink.count('s3lib.circuit.state_change', state=OPEN), 1)
+
+    def test_single_probe_when_half_open(self):
+        from s3lib.resilience import CircuitOpenError, CLOSED, HALF_OPEN
+
+        self._fail(3)
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.before_call()
+        # Only the probe goes through until it completes
+        for _ in range(3):
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.before_call()
+        self.assertEqual(self.sink.count('s3lib.circuit.state_change', state=CLOSED), 1)
+
+    def test_failed_probe_opens_again(self):
+        from s3lib.resilience import CircuitOpenError, HALF_OPEN, OPEN
+
+        self._fail(3)
+        self.clock.now += 15
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        # A single failure reopens the circuit, for a whole recovery timeout from the probe
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now += 9
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.clock.now += 1
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.before_call()
+
+    def test_reset(self):
+        from s3lib.resilience import CLOSED
+
+        self._fail(3)
+        self.breaker.reset()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.before_call()
+
+
+class ResilienceHooksTest(unittest.TestCase):
+    # Nothing listens on port 1, connections are refused at once
+    endpoint = 'http://127.0.0.1:1/'
+
+    def setUp(self):
+        from django.conf import settings
+        from s3lib import resilience
+        from s3lib.clients import client_pool
+
+        settings.S3_RETRY_MAX_ATTEMPTS = 1
+        try:
+            self.client = client_pool.get_client('s3', self.endpoint, 'testing', 'testing', 's3v4', timeouts=(1, 1))
+        finally:
+            del settings.S3_RETRY_MAX_ATTEMPTS
+        self.breaker = resilience.get_circuit_breaker(self.endpoint)
+        self.breaker.reset()
+        self.addCleanup(self.breaker.reset)
+
+    def test_unreachable_endpoint_opens_the_circuit(self):
+        from botocore.exceptions import EndpointConnectionError
+        from s3lib.resilience import circuit_breaker_states, CircuitOpenError, OPEN
+
+        for _ in range(self.breaker.failure_threshold):
+            with self.assertRaises(EndpointConnectionError):
+                self.client.head_bucket(Bucket='unreachable')
+        self.assertEqual(circuit_breaker_states()[self.endpoint]['state'], OPEN)
+        start = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            self.client.head_bucket(Bucket='unreachable')
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(circuit_breaker_states()[self.endpoint]['total_rejected'], 1)
+
+    def test_other_errors_count_as_success(self):
+        from s3lib.resilience import CLOSED
+
+        for _ in range(self.breaker.failure_threshold - 1):
+            self.breaker.record_failure()
+        # An error raised by the client itself (not a connection problem) does not open the circuit
+        self.client.meta.events.emit('after-call-error.s3.HeadBucket', exception=ValueError('bad parameter'),
+                                     context={})
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.snapshot()['consecutive_failures'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()